@@ -209,8 +209,74 @@
     });
   }
 
-  function renderScoreboard(leagueId, contentEl) {
-    contentEl.innerHTML = '<div class="note">Loading scoreboard...</div>';
+  // Copy a /scoreboard/stream event state (status, clock, period, scores) onto a scoreboard event
+  function applyLiveState(ev, state) {
+    var comp = (ev.competitions || [])[0] || {};
+    var status = ev.status || comp.status || (ev.status = {});
+    status.type = status.type || {};
+    status.type.state = state.state;
+    if (state.detail) status.type.shortDetail = state.detail;
+    status.displayClock = state.clock;
+    status.period = state.period;
+    (comp.competitors || []).forEach(function(c) {
+      if (state.scores && state.scores[c.id] != null) c.score = state.scores[c.id];
+    });
+  }
+
+  // Live scores over Server-Sent Events: one stream for all leagues (/api/scoreboard/stream?leagues=...), so the
+  // page holds a single connection whatever it shows. onStates(leagueId, states, removed) returns false when a
+  // message names games it isn't showing, and refresh() reloads the board. Without a Stats API, EventSource or a
+  // server that streams, refresh() runs every pollMs instead. Returns a stop function.
+  function watchScoreboard(leagueIds, onStates, refresh, pollMs) {
+    var base = getStatsBase();
+    var timer = null;
+    var source = null;
+    function poll() {
+      if (!timer) timer = setInterval(refresh, pollMs);
+    }
+    if (!base || !window.EventSource) {
+      poll();
+    } else {
+      source = new EventSource(base + '/api/scoreboard/stream?leagues=' + encodeURIComponent(leagueIds.join(',')));
+      var onMessage = function(e) {
+        var msg;
+        try { msg = JSON.parse(e.data); } catch (err) { return; }
+        if (leagueIds.indexOf(msg.league) === -1) return;
+        if (!onStates(msg.league, msg.events || [], msg.removed || [])) refresh();
+      };
+      source.addEventListener('snapshot', onMessage);
+      source.addEventListener('update', onMessage);
+      source.onerror = function() {
+        // EventSource reconnects by itself; CLOSED means it gave up (no stream on this server)
+        if (source.readyState === EventSource.CLOSED) poll();
+      };
+    }
+    return function stop() {
+      if (source) source.close();
+      if (timer) clearInterval(timer);
+      timer = null;
+    };
+  }
+
+  // Events on the scoreboard tab and a function that draws them again after live updates
+  var shownEvents = null;
+  var redraw = null;
+
+  function applyToShown(leagueId, states, removed) {
+    if (!shownEvents) return true;
+    var byId = {};
+    shownEvents.forEach(function(ev) { byId[String(ev.id)] = ev; });
+    var known = removed.every(function(id) { return !byId[id]; });
+    states.forEach(function(state) {
+      if (byId[state.id]) applyLiveState(byId[state.id], state);
+      else known = false;
+    });
+    if (known && states.length && redraw) redraw();
+    return known;
+  }
+
+  function renderScoreboard(leagueId, contentEl, refreshing) {
+    if (!refreshing) contentEl.innerHTML = '<div class="note">Loading scoreboard...</div>';
     var today = new Date();
     function dateStr(d) { return d.getFullYear() + String(d.getMonth() + 1).padStart(2, '0') + String(d.getDate()).padStart(2, '0'); }
     function tryNextDate(dayOffset, maxDays, cb) {
@@ -230,11 +296,9 @@
         }
       }).catch(function() { tryNextDate(dayOffset + 1, maxDays, cb); });
     }
-    tryNextDate(0, 14, function(events, label) {
-      if (!events || !events.length) {
-        contentEl.innerHTML = '<div class="note">No games in the next 2 weeks for this league.</div>';
-        return;
-      }
+    function draw(events, label) {
+      shownEvents = events;
+      redraw = function() { draw(events, label); };
       var html = (label ? '<div class="sb-date-label" style="font-size:0.9rem;color:#b8c6e0;margin-bottom:0.5rem;font-weight:bold;">' + esc(label) + '</div>' : '') + '<div class="scoreboard-list">';
       events.forEach(function(ev) {
         var comp = (ev.competitions || [])[0] || {};
@@ -254,6 +318,14 @@
       });
       html += '</div>';
       contentEl.innerHTML = html;
+    }
+    tryNextDate(0, 14, function(events, label) {
+      if (!events || !events.length) {
+        shownEvents = [];
+        contentEl.innerHTML = '<div class="note">No games in the next 2 weeks for this league.</div>';
+        return;
+      }
+      draw(events, label);
     });
   }
 
@@ -264,7 +336,12 @@
     if (titleEl) titleEl.textContent = LEAGUE_NAMES[leagueId] || leagueId.toUpperCase();
     document.getElementById('page-title').textContent = (LEAGUE_NAMES[leagueId] || leagueId) + ' - Bragging Rights';
 
+    var stopLive = null;
+
     function switchTab(tab) {
+      if (stopLive) stopLive();
+      stopLive = null;
+      shownEvents = redraw = null;
       document.querySelectorAll('.league-tab').forEach(function(t) {
         t.classList.toggle('active', t.getAttribute('data-tab') === tab);
       });
@@ -272,7 +349,12 @@
       else if (tab === 'players') renderPlayers(leagueId, contentEl);
       else if (tab === 'standings') renderStandings(leagueId, contentEl);
       else if (tab === 'schedule') renderSchedule(leagueId, contentEl);
-      else if (tab === 'scoreboard') renderScoreboard(leagueId, contentEl);
+      else if (tab === 'scoreboard') {
+        renderScoreboard(leagueId, contentEl);
+        stopLive = watchScoreboard([leagueId], applyToShown, function() {
+          renderScoreboard(leagueId, contentEl, true);
+        }, 60000);
+      }
     }
 
     document.querySelectorAll('.league-tab').forEach(function(btn) {
@@ -41,12 +41,80 @@
     return fetchJson(base + '/api/' + leagueId + '/matchup/' + eventId);
   }
 
+  // Copy a /scoreboard/stream event state (status, clock, period, scores) onto a scoreboard event
+  function applyLiveState(ev, state) {
+    var comp = (ev.competitions || [])[0] || {};
+    var status = ev.status || comp.status || (ev.status = {});
+    status.type = status.type || {};
+    status.type.state = state.state;
+    if (state.detail) status.type.shortDetail = state.detail;
+    status.displayClock = state.clock;
+    status.period = state.period;
+    (comp.competitors || []).forEach(function(c) {
+      if (state.scores && state.scores[c.id] != null) c.score = state.scores[c.id];
+    });
+  }
+
+  // Live scores over Server-Sent Events: one stream for all leagues (/api/scoreboard/stream?leagues=...), so the
+  // page holds a single connection whatever it shows. onStates(leagueId, states, removed) returns false when a
+  // message names games it isn't showing, and refresh() reloads the board. Without a Stats API, EventSource or a
+  // server that streams, refresh() runs every pollMs instead. Returns a stop function.
+  function watchScoreboard(leagueIds, onStates, refresh, pollMs) {
+    var base = getStatsBase();
+    var timer = null;
+    var source = null;
+    function poll() {
+      if (!timer) timer = setInterval(refresh, pollMs);
+    }
+    if (!base || !window.EventSource) {
+      poll();
+    } else {
+      source = new EventSource(base + '/api/scoreboard/stream?leagues=' + encodeURIComponent(leagueIds.join(',')));
+      var onMessage = function(e) {
+        var msg;
+        try { msg = JSON.parse(e.data); } catch (err) { return; }
+        if (leagueIds.indexOf(msg.league) === -1) return;
+        if (!onStates(msg.league, msg.events || [], msg.removed || [])) refresh();
+      };
+      source.addEventListener('snapshot', onMessage);
+      source.addEventListener('update', onMessage);
+      source.onerror = function() {
+        // EventSource reconnects by itself; CLOSED means it gave up (no stream on this server)
+        if (source.readyState === EventSource.CLOSED) poll();
+      };
+    }
+    return function stop() {
+      if (source) source.close();
+      if (timer) clearInterval(timer);
+      timer = null;
+    };
+  }
+
+  // The board on screen ({byLeague, label}) and a function that draws it again after live updates
+  var shown = null;
+  var redraw = null;
+
+  function applyToShown(leagueId, states, removed) {
+    if (!shown) return true;
+    var byId = {};
+    (shown.byLeague[leagueId] || []).forEach(function(ev) { byId[String(ev.id)] = ev; });
+    var known = removed.every(function(id) { return !byId[id]; });
+    states.forEach(function(state) {
+      if (byId[state.id]) applyLiveState(byId[state.id], state);
+      else known = false;
+    });
+    if (known && states.length && redraw) redraw();
+    return known;
+  }
+
   function renderScoreboard() {
     var el = document.getElementById('scoreboard-list');
     var note = document.getElementById('scoreboard-note');
     if (!el) return;
 
     function render(eventsByLeague, label) {
+      shown = { byLeague: eventsByLeague, label: label };
+      redraw = function() { render(shown.byLeague, shown.label); };
       var html = '';
       if (label) {
         html += '<div class="sb-date-label" style="font-size:0.8rem;color:#b8c6e0;margin-bottom:0.5rem;font-weight:bold;">' + label + '</div>';
@@ -87,7 +155,8 @@
       }
     }
 
-    note.textContent = 'Loading scores...';
+    // The note is replaced by the first render; later refreshes keep the board up meanwhile
+    if (note) note.textContent = 'Loading scores...';
     var today = new Date();
     function dateToStr(d) {
       return d.getFullYear() + String(d.getMonth() + 1).padStart(2, '0') + String(d.getDate()).padStart(2, '0');
@@ -297,13 +366,15 @@
     document.getElementById('stats-modal').classList.add('hidden');
   });
 
+  function startScoreboard() {
+    if (!document.getElementById('scoreboard-list')) return;
+    renderScoreboard();
+    watchScoreboard(LEAGUES_ORDER, applyToShown, renderScoreboard, 60000);
+  }
+
   if (document.readyState === 'loading') {
-    document.addEventListener('DOMContentLoaded', function() {
-      renderScoreboard();
-      setInterval(renderScoreboard, 60000);
-    });
+    document.addEventListener('DOMContentLoaded', startScoreboard);
   } else {
-    renderScoreboard();
-    setInterval(renderScoreboard, 60000);
+    startScoreboard();
   }
 })();
@@ -0,0 +1,234 @@
+"""
+Content-addressed snapshot archive for harvested data.
+Each distinct payload is stored once as archive/blobs/{sha256}.json.gz and a small
+per-league manifest.json records when each data type's content changed.
+
+compact() rolls history older than today into one pack per data type and day:
+packs/{data_type}/{YYYYMMDD}.jsonl.gz is a series of gzip members (one JSON line per
+distinct snapshot) and {YYYYMMDD}.idx.json maps each member's byte offset and length,
+so a single snapshot is read with one seek instead of decompressing the whole day.
+"""
+
+import gzip
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+from config import ARCHIVE_RETENTION_DAYS
+from jsonio import atomic_write, dumps, loads, read_json, write_json
+from locks import FileLock
+
+logger = logging.getLogger(__name__)
+
+# Data types kept as archived history (dated and per-event types are not)
+ARCHIVED_TYPES = ("teams", "standings", "scoreboard", "schedule")
+
+# Pre-manifest archive copies: data/{league}/{data_type}_{YYYYmmdd_HHMMSS}.json
+_LEGACY_ARCHIVE = re.compile(rf"^({'|'.join(ARCHIVED_TYPES)})_(\d{{8}}_\d{{6}})\.json$")
+
+def content_hash(encoded: bytes) -> str:
+    """SHA-256 of an encoded payload; the blob's address in the archive."""
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SnapshotArchive:
+    """
+    Archive for one league directory.
+    manifest.json: data_type -> {"hash", "harvested_at", "history": [[timestamp, hash], ...]}
+    History gets an entry only when content changes, so it grows with real data changes.
+    record() and compact() rewrite the manifest and delete blobs, so they hold archive/.lock:
+    the web server, the daemon and CLI harvests may all write the same league.
+    """
+
+    def __init__(self, league_dir: Path):
+        self.league_dir = Path(league_dir)
+        self.blob_dir = self.league_dir / "archive" / "blobs"
+        self.manifest_path = self.league_dir / "manifest.json"
+
+    def _lock(self) -> FileLock:
+        return FileLock(self.league_dir / "archive" / ".lock")
+
+    def load_manifest(self) -> dict[str, Any]:
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            return read_json(self.manifest_path)
+        except (OSError, ValueError):
+            return {}
+
+    def current_hash(self, data_type: str) -> Optional[str]:
+        return (self.load_manifest().get(data_type) or {}).get("hash")
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blob_dir / f"{digest}.json.gz"
+
+    def record(self, data_type: str, digest: str, encoded: bytes, timestamp: datetime) -> bool:
+        """Store the blob (once) and note the change in the manifest. Returns False if unchanged."""
+        with self._lock():
+            manifest = self.load_manifest()
+            entry = manifest.setdefault(data_type, {"history": []})
+            if entry.get("hash") == digest:
+                return False
+            blob = self.blob_path(digest)
+            if not blob.exists():
+                self.blob_dir.mkdir(parents=True, exist_ok=True)
+                atomic_write(blob, gzip.compress(encoded, mtime=0))
+            ts = timestamp.isoformat()
+            entry.update(hash=digest, harvested_at=ts)
+            entry["history"].append([ts, digest])
+            write_json(self.manifest_path, manifest)
+            return True
+
+    def snapshots(self, data_type: str) -> list[tuple[str, str]]:
+        """(timestamp, hash) for every recorded change of a data type, oldest first."""
+        entry = self.load_manifest().get(data_type) or {}
+        return [(ts, digest) for ts, digest in entry.get("history", [])]
+
+    def read_blob(self, digest: str) -> Optional[Any]:
+        path = self.blob_path(digest)
+        if not path.exists():
+            return None
+        with open(path, "rb") as f:
+            return loads(gzip.decompress(f.read()))
+
+    # --- Daily packs ---
+
+    def pack_dir(self, data_type: str) -> Path:
+        return self.league_dir / "packs" / data_type
+
+    def _pack_paths(self, data_type: str, day: str) -> tuple[Path, Path]:
+        base = self.pack_dir(data_type)
+        return base / f"{day}.jsonl.gz", base / f"{day}.idx.json"
+
+    def _load_index(self, index_path: Path) -> dict[str, Any]:
+        if not index_path.exists():
+            return {"snapshots": [], "blobs": {}}
+        return read_json(index_path)
+
+    def _write_pack(self, data_type: str, day: str, entries: list[tuple[str, str, bytes]]) -> None:
+        """Append (timestamp, hash, encoded) snapshots to a day's pack, one gzip member per new blob."""
+        pack_path, index_path = self._pack_paths(data_type, day)
+        pack_path.parent.mkdir(parents=True, exist_ok=True)
+        index = self._load_index(index_path)
+        with open(pack_path, "ab") as f:
+            offset = f.tell()
+            for ts, digest, encoded in entries:
+                if digest not in index["blobs"]:
+                    member = gzip.compress(encoded + b"\n", mtime=0)
+                    f.write(member)
+                    index["blobs"][digest] = [offset, len(member)]
+                    offset += len(member)
+                index["snapshots"].append([ts, digest])
+        index["snapshots"].sort()
+        # The index is published after the data it points to, so readers never see a dangling offset
+        write_json(index_path, index)
+
+    def _read_pack_blob(self, data_type: str, day: str, digest: str) -> Optional[Any]:
+        pack_path, index_path = self._pack_paths(data_type, day)
+        loc = self._load_index(index_path)["blobs"].get(digest)
+        if not loc:
+            return None
+        with open(pack_path, "rb") as f:
+            f.seek(loc[0])
+            return loads(gzip.decompress(f.read(loc[1])))
+
+    def pack_days(self, data_type: str) -> list[str]:
+        """YYYYMMDD of every pack for a data type, oldest first."""
+        base = self.pack_dir(data_type)
+        if not base.exists():
+            return []
+        return sorted(p.name[:8] for p in base.glob("*.idx.json"))
+
+    def read_snapshot(self, data_type: str, when: datetime) -> Optional[Any]:
+        """Data as it was at `when`: the latest snapshot at or before that time, or None."""
+        ts = when.isoformat()
+        recent = [(t, d) for t, d in self.snapshots(data_type) if t <= ts]
+        if recent:
+            return self.read_blob(recent[-1][1])
+        day = when.strftime("%Y%m%d")
+        for pack_day in reversed([d for d in self.pack_days(data_type) if d <= day]):
+            _, index_path = self._pack_paths(data_type, pack_day)
+            candidates = [d for t, d in self._load_index(index_path)["snapshots"] if t <= ts]
+            if candidates:
+                return self._read_pack_blob(data_type, pack_day, candidates[-1])
+        return None
+
+    def compact(self, before: Optional[date] = None, retention_days: int = ARCHIVE_RETENTION_DAYS) -> int:
+        """
+        Roll snapshots older than `before` (default: today) into daily packs, including
+        legacy timestamped archive files, drop blobs no longer referenced, and delete packs
+        older than retention_days (0 keeps everything) unless they hold a type's current
+        content, which read_snapshot() still needs. Returns number of snapshots packed.
+        """
+        before = before or date.today()
+        with self._lock():
+            manifest = self.load_manifest()
+            groups: dict[tuple[str, str], list[tuple[str, str, bytes]]] = defaultdict(list)
+
+            for data_type, entry in manifest.items():
+                keep = []
+                for ts, digest in entry.get("history", []):
+                    when = datetime.fromisoformat(ts)
+                    blob = self.blob_path(digest)
+                    if when.date() >= before or not blob.exists():
+                        keep.append([ts, digest])
+                        continue
+                    encoded = gzip.decompress(blob.read_bytes())
+                    groups[(data_type, when.strftime("%Y%m%d"))].append((ts, digest, encoded))
+                entry["history"] = keep
+
+            legacy_files = []
+            for path in self.league_dir.glob("*_*_*.json"):
+                m = _LEGACY_ARCHIVE.match(path.name)
+                if not m:
+                    continue
+                when = datetime.strptime(m.group(2), "%Y%m%d_%H%M%S")
+                if when.date() >= before:
+                    continue
+                try:
+                    payload = read_json(path)
+                except (OSError, ValueError) as e:
+                    logger.warning("Skipping unreadable archive file %s: %s", path, e)
+                    continue
+                encoded = dumps(payload.get("data", payload))
+                groups[(m.group(1), when.strftime("%Y%m%d"))].append(
+                    (when.isoformat(), content_hash(encoded), encoded)
+                )
+                legacy_files.append(path)
+
+            for (data_type, day), entries in groups.items():
+                self._write_pack(data_type, day, sorted(entries))
+            if groups:
+                write_json(self.manifest_path, manifest)
+            for path in legacy_files:
+                path.unlink(missing_ok=True)
+
+            # Blobs stay only while the manifest (current content or unpacked history) refers to them
+            referenced = {e.get("hash") for e in manifest.values()}
+            referenced.update(d for e in manifest.values() for _, d in e.get("history", []))
+            if self.blob_dir.exists():
+                for blob in self.blob_dir.glob("*.json.gz"):
+                    if blob.name[: -len(".json.gz")] not in referenced:
+                        blob.unlink(missing_ok=True)
+
+            if retention_days > 0:
+                cutoff = (date.today() - timedelta(days=retention_days)).strftime("%Y%m%d")
+                for data_type in ARCHIVED_TYPES:
+                    current = (manifest.get(data_type) or {}).get("hash")
+                    for day in self.pack_days(data_type):
+                        if day >= cutoff:
+                            continue
+                        pack_path, index_path = self._pack_paths(data_type, day)
+                        if current in self._load_index(index_path)["blobs"]:
+                            continue
+                        pack_path.unlink(missing_ok=True)
+                        index_path.unlink(missing_ok=True)
+
+        packed = sum(len(entries) for entries in groups.values())
+        if packed:
+            logger.info("Compacted %d snapshots for %s", packed, self.league_dir.name)
+        return packed
@@ -29,11 +29,148 @@ LEAGUES = {
 }
 
 # Data types to harvest
-DATA_TYPES = ["teams", "standings", "scoreboard", "schedule", "game_summary"]
+DATA_TYPES = [
+    "teams", "standings", "scoreboard", "schedule", "game_summary",
+    "rosters", "team_stats", "athletes", "rankings", "matchups",
+]
 
-# Default output directory for harvested data (website-consumable)
-DATA_DIR = Path(__file__).parent / "data"
+# Game summaries harvested per league per run (scheduled / programmatic harvests)
+MAX_SUMMARIES_PER_LEAGUE = 20
+
+# Matchup documents (matchups.py): scheduled events this many days ahead get one too,
+# and stored team statistics older than TEAM_STATS_MAX_AGE seconds are refetched
+MATCHUP_SCHEDULE_DAYS = 7
+TEAM_STATS_MAX_AGE = 6 * 3600
+
+# Team and player pages (rosters.py): roster_{team_id} and athlete_{athlete_id} files older
+# than these many seconds are refetched; a run refreshes at most ATHLETES_PER_RUN athletes
+# per league, stalest first, so one run never holds the scheduler for long
+ROSTER_MAX_AGE = 6 * 3600
+ATHLETE_MAX_AGE = 24 * 3600
+ATHLETES_PER_RUN = 60
+
+# Store unprojected ESPN responses too (data/{league}/raw/), e.g. for debugging schemas
+KEEP_RAW_PAYLOADS = os.environ.get("STATS_KEEP_RAW", "").lower() in ("1", "true", "yes")
+
+# Also write precompressed data/{league}/{data_type}.json.gz for a static server (e.g. nginx
+# gzip_static) to send as-is. Off by default: serve.py compresses from the snapshot instead
+WRITE_GZIP = os.environ.get("STATS_WRITE_GZIP", "").lower() in ("1", "true", "yes")
+
+# Archive compaction: history older than today is packed per day; packs older than this are deleted (0 = keep)
+ARCHIVE_RETENTION_DAYS = int(os.environ.get("STATS_ARCHIVE_RETENTION_DAYS", 90))
+COMPACT_INTERVAL = 86400
+
+# Also write scheduled harvests to the normalized SQLite store (data/stats.db)
+SQLITE_ENABLED = os.environ.get("STATS_SQLITE", "").lower() in ("1", "true", "yes")
+
+# In-process cache of parsed data files (loader.py), bytes of JSON on disk
+LOADER_CACHE_MAX_BYTES = int(os.environ.get("STATS_LOADER_CACHE_BYTES", 64 * 1024 * 1024))
+
+# Cache-Control max-age (seconds) for the JSON API; clients revalidate with the ETag after that
+API_MAX_AGE = {
+    "scoreboard": 10,
+    "past_scoreboard": 3600,
+    "final_scoreboard": 365 * 86400,  # past day, every game final: never changes
+    "standings": 300,
+    "schedule": 300,
+    "teams": 3600,
+}
+# /api/<league>/scoreboard?date= accepts days from this many days back (the current and previous
+# season of every league) to this many ahead (the rest of a published schedule)
+SCOREBOARD_DATE_DAYS_BACK = 2 * 366
+SCOREBOARD_DATE_DAYS_AHEAD = 366
+
+# Live scoreboard stream (/api/<league>/scoreboard/stream): seconds between checks for a new
+# scoreboard, seconds between keep-alive comments, and messages buffered per slow client
+SSE_POLL_INTERVAL = 1.0
+SSE_KEEPALIVE_INTERVAL = 15.0
+SSE_QUEUE_SIZE = 100
+
+# Poll preview images (/api/og-image): PNGs kept in memory (count) and under data/og_images/
+# (deleted after OG_IMAGE_DISK_MAX_AGE seconds unused, least recently used first beyond
+# OG_IMAGE_DISK_MAX_FILES); misses render in OG_IMAGE_WORKERS processes
+# (0 = render in the request thread; gevent workers use gevent's thread pool instead)
+OG_IMAGE_MEMORY_ENTRIES = 256
+OG_IMAGE_DISK_MAX_AGE = 30 * 86400
+OG_IMAGE_DISK_MAX_FILES = 2000
+OG_IMAGE_WORKERS = int(os.environ.get("STATS_OG_WORKERS", 2))
+OG_IMAGE_MAX_AGE = 86400
+
+# Shared read-only snapshot (data/snapshots) published after each harvest and mmapped by web workers
+SNAPSHOT_ENABLED = os.environ.get("STATS_SNAPSHOT", "1").lower() not in ("0", "false", "no")
+SNAPSHOT_TYPES = ("teams", "standings", "scoreboard", "schedule", "news", "summaries_today")
+SNAPSHOT_KEEP_VERSIONS = 3
+SNAPSHOT_CHECK_INTERVAL = 1.0  # seconds between checks of data/snapshots/CURRENT
+
+# Default output directory for harvested data (website-consumable). STATS_DATA_DIR points the
+# web server and a separate harvest daemon at the same shared directory
+DATA_DIR = Path(os.environ.get("STATS_DATA_DIR") or Path(__file__).parent / "data")
 
 # Request settings
-REQUEST_TIMEOUT = 30
 REQUEST_DELAY = 0.5  # Seconds between requests to be respectful to API
+REQUEST_TIMEOUT = 30
+# Shared deadline (seconds) for a web page's parallel upstream calls (ESPNHarvester.fan_out)
+PAGE_FETCH_DEADLINE = float(os.environ.get("ESPN_PAGE_DEADLINE", 10))
+
+# Cache for live fetches (data/http_cache/): TTL in seconds per endpoint. Stale entries are
+# served for up to HTTP_CACHE_MAX_STALE more seconds while a background refresh runs.
+HTTP_CACHE_TTLS = {
+    "team_detail": 6 * 3600,  # record + roster
+    "team_statistics": 3600,
+    "athlete_info": 24 * 3600,
+    "player_statistics": 3600,
+    "scoreboard": 60,  # dated scoreboard with games not yet final
+    # Past day, every game final: it never changes, but serve.py stores it as scoreboard_{date},
+    # so the cached copy only has to bridge until then and is pruned like any other
+    "final_scoreboard": 86400,
+}
+HTTP_CACHE_MAX_STALE = 7 * 86400
+# In-memory tier of the response cache, bytes of encoded JSON (the disk tier is pruned by age)
+HTTP_CACHE_MEMORY_BYTES = int(os.environ.get("STATS_HTTP_CACHE_BYTES", 32 * 1024 * 1024))
+
+# Date-range scoreboards: days per dates=YYYYMMDD-YYYYMMDD request, and event limit per request.
+# ESPN buckets games by US Eastern date.
+SCOREBOARD_RANGE_CHUNK_DAYS = 14
+SCOREBOARD_RANGE_LIMIT = 1000
+SCOREBOARD_TIMEZONE = "America/New_York"
+
+# Concurrent transport: requests overlap, but each host stays within a
+# token-bucket budget (default matches the old one-request-per-REQUEST_DELAY pace)
+REQUESTS_PER_SECOND = float(os.environ.get("ESPN_REQUESTS_PER_SECOND", 1 / REQUEST_DELAY))
+RATE_LIMIT_BURST = float(os.environ.get("ESPN_RATE_LIMIT_BURST", 4))
+MAX_CONCURRENT_REQUESTS = int(os.environ.get("ESPN_MAX_CONCURRENT_REQUESTS", 8))
+# Separate threads for web pages' fan_out calls, so their stragglers never occupy the
+# harvest/background pool (and vice versa)
+PAGE_FETCH_WORKERS = int(os.environ.get("ESPN_PAGE_WORKERS", 4))
+HTTP_POOL_SIZE = MAX_CONCURRENT_REQUESTS + PAGE_FETCH_WORKERS
+
+# Adaptive harvest scheduler (serve.py): poll intervals in seconds
+SCOREBOARD_LIVE_INTERVAL = 10  # a game is in progress
+SCOREBOARD_IDLE_INTERVAL = 3600  # in season, nothing live (capped by the next start time)
+SCOREBOARD_OFFSEASON_INTERVAL = 86400
+SUMMARY_LIVE_INTERVAL = 60  # incremental game summaries while games are live
+BASE_TYPE_INTERVALS = {
+    "teams": 86400,
+    "standings": 3600,
+    "schedule": 3600,
+    "rosters": 6 * 3600,
+    "team_stats": 6 * 3600,
+    "athletes": 900,  # ATHLETES_PER_RUN at a time
+    "matchups": 3600,  # also rebuilt after any run that changes their events, summaries or stats
+}
+# Seconds between attempts to become the scheduler leader (data/scheduler.lock)
+LEADER_RETRY_INTERVAL = 30
+# Run the scheduler thread inside the web server (STATS_SCHEDULER=0 when `main.py --daemon` harvests instead)
+SCHEDULER_IN_WEB = os.environ.get("STATS_SCHEDULER", "1").lower() not in ("0", "false", "no")
+# /api/harvest jobs whose status is kept under data/jobs/, and seconds between the scheduler's
+# checks for a queued job
+HARVEST_JOB_HISTORY = 50
+HARVEST_JOB_POLL_INTERVAL = 5
+
+# Months (start, end) a league plays games, including postseason; may wrap the new year
+SEASON_MONTHS = {
+    "nba": (10, 6),
+    "nhl": (10, 6),
+    "nfl": (9, 2),
+    "mlb": (3, 11),
+}
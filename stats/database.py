@@ -0,0 +1,293 @@
+"""
+Normalized SQLite store for harvested stats.
+Teams, events, competitors, standings rows and box score lines live in indexed
+tables, written through one long-lived WAL-mode connection with each harvest
+run committed as a single transaction.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from config import DATA_DIR
+from gametime import event_day, get_season_year
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    league TEXT NOT NULL,
+    team_id TEXT NOT NULL,
+    abbreviation TEXT,
+    display_name TEXT,
+    short_name TEXT,
+    location TEXT,
+    name TEXT,
+    color TEXT,
+    alternate_color TEXT,
+    logo TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (league, team_id)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    league TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    start_time TEXT,
+    game_date TEXT,
+    season INTEGER,
+    season_type INTEGER,
+    week INTEGER,
+    name TEXT,
+    short_name TEXT,
+    state TEXT,
+    status_detail TEXT,
+    completed INTEGER,
+    venue TEXT,
+    city TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (league, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_league_date ON events (league, game_date);
+
+CREATE TABLE IF NOT EXISTS competitors (
+    league TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    team_id TEXT NOT NULL,
+    home_away TEXT,
+    score TEXT,
+    winner INTEGER,
+    PRIMARY KEY (league, event_id, team_id)
+);
+CREATE INDEX IF NOT EXISTS idx_competitors_team ON competitors (league, team_id);
+
+CREATE TABLE IF NOT EXISTS standings_rows (
+    league TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    group_name TEXT,
+    team_id TEXT NOT NULL,
+    wins REAL,
+    losses REAL,
+    win_percent REAL,
+    games_behind REAL,
+    stats_json TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (league, season, team_id)
+);
+CREATE INDEX IF NOT EXISTS idx_standings_team ON standings_rows (league, team_id);
+
+CREATE TABLE IF NOT EXISTS box_score_lines (
+    league TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    team_id TEXT,
+    athlete_id TEXT NOT NULL,
+    athlete_name TEXT,
+    category TEXT NOT NULL,
+    starter INTEGER,
+    did_not_play INTEGER,
+    stats_json TEXT NOT NULL,
+    PRIMARY KEY (league, event_id, athlete_id, category)
+);
+CREATE INDEX IF NOT EXISTS idx_box_athlete ON box_score_lines (league, athlete_id);
+CREATE INDEX IF NOT EXISTS idx_box_team ON box_score_lines (league, team_id);
+"""
+
+_EVENT_TYPES = re.compile(r"^(scoreboard|schedule)(_\d+)?$")
+_SUMMARY_TYPE = re.compile(r"^summary_(\w+)$")
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _team_rows(league_id: str, data: dict, ts: str) -> Iterable[tuple]:
+    for sport in data.get("sports", []):
+        for league in sport.get("leagues", []):
+            for item in league.get("teams", []):
+                t = item.get("team") or {}
+                if not t.get("id"):
+                    continue
+                logos = t.get("logos") or [{}]
+                yield (
+                    league_id, str(t["id"]), t.get("abbreviation"), t.get("displayName"),
+                    t.get("shortDisplayName"), t.get("location"), t.get("name"), t.get("color"),
+                    t.get("alternateColor"), logos[0].get("href") or t.get("logo"), ts,
+                )
+
+
+def _event_rows(league_id: str, data: dict, ts: str) -> Iterable[tuple[tuple, list[tuple]]]:
+    for event in data.get("events", []):
+        if not event.get("id"):
+            continue
+        event_id = str(event["id"])
+        comp = (event.get("competitions") or [{}])[0]
+        status = event.get("status") or comp.get("status") or {}
+        status_type = status.get("type") or {}
+        season = event.get("season") or {}
+        venue = comp.get("venue") or {}
+        row = (
+            league_id, event_id, event.get("date"), event_day(event), season.get("year"),
+            season.get("type"), (event.get("week") or {}).get("number"), event.get("name"),
+            event.get("shortName"), status_type.get("state"), status_type.get("shortDetail"),
+            int(bool(status_type.get("completed"))), venue.get("fullName"),
+            (venue.get("address") or {}).get("city"), ts,
+        )
+        competitors = [
+            (
+                league_id, event_id, str(c.get("id") or (c.get("team") or {}).get("id")),
+                c.get("homeAway"), c.get("score"), int(bool(c.get("winner"))),
+            )
+            for c in comp.get("competitors", [])
+        ]
+        yield row, competitors
+
+
+def _season_year(value: Any) -> Optional[int]:
+    """ESPN's season is a year, a numeric string or {"year": ...}; None if it's none of those."""
+    if isinstance(value, dict):
+        value = value.get("year")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _standings_rows(league_id: str, data: dict, ts: str) -> Iterable[tuple]:
+    for group in data.get("children", []) or [data]:
+        standings = group.get("standings") if isinstance(group.get("standings"), dict) else group
+        season = (
+            _season_year(standings.get("season"))
+            or _season_year(data.get("season"))
+            or get_season_year(league_id, datetime.fromisoformat(ts))
+        )
+        for entry in standings.get("entries", []):
+            team_id = (entry.get("team") or {}).get("id")
+            if not team_id:
+                continue
+            stats = {s["name"]: s.get("value") for s in entry.get("stats", []) if s.get("name")}
+            yield (
+                league_id, season, group.get("name"), str(team_id), _float(stats.get("wins")),
+                _float(stats.get("losses")), _float(stats.get("winPercent")),
+                _float(stats.get("gamesBehind")), json.dumps(stats), ts,
+            )
+
+
+def _box_score_rows(league_id: str, event_id: str, data: dict) -> Iterable[tuple]:
+    for team_block in (data.get("boxscore") or {}).get("players", []):
+        team_id = (team_block.get("team") or {}).get("id")
+        for category in team_block.get("statistics", []):
+            keys = category.get("keys") or category.get("labels") or []
+            name = category.get("name") or ",".join(category.get("labels") or []) or "stats"
+            for line in category.get("athletes", []):
+                athlete = line.get("athlete") or {}
+                if not athlete.get("id"):
+                    continue
+                stats = dict(zip(keys, line.get("stats") or []))
+                yield (
+                    league_id, event_id, str(team_id) if team_id else None, str(athlete["id"]),
+                    athlete.get("displayName"), name, int(bool(line.get("starter"))),
+                    int(bool(line.get("didNotPlay"))), json.dumps(stats),
+                )
+
+
+class StatsDatabase:
+    """One long-lived connection per database file; safe to share across threads."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def write_run(self, payloads: dict[str, dict[str, Any]], harvested_at: Optional[datetime] = None) -> int:
+        """
+        Write one harvest run (league_id -> data_type -> data) in a single transaction.
+        Returns number of rows written.
+        """
+        ts = (harvested_at or datetime.now()).isoformat()
+        teams, events, competitors, standings, box_lines = [], [], [], [], []
+        for league_id, by_type in payloads.items():
+            for data_type, data in by_type.items():
+                if not isinstance(data, dict):
+                    continue
+                if data_type == "teams":
+                    teams.extend(_team_rows(league_id, data, ts))
+                elif data_type == "standings":
+                    standings.extend(_standings_rows(league_id, data, ts))
+                elif _EVENT_TYPES.match(data_type):
+                    for row, comps in _event_rows(league_id, data, ts):
+                        events.append(row)
+                        competitors.extend(comps)
+                elif m := _SUMMARY_TYPE.match(data_type):
+                    box_lines.extend(_box_score_rows(league_id, m.group(1), data))
+
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                cur.executemany("INSERT OR REPLACE INTO teams VALUES (?,?,?,?,?,?,?,?,?,?,?)", teams)
+                cur.executemany(
+                    "INSERT OR REPLACE INTO events VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)", events
+                )
+                cur.executemany("INSERT OR REPLACE INTO competitors VALUES (?,?,?,?,?,?)", competitors)
+                cur.executemany(
+                    "INSERT OR REPLACE INTO standings_rows VALUES (?,?,?,?,?,?,?,?,?,?)", standings
+                )
+                cur.executemany(
+                    "INSERT OR REPLACE INTO box_score_lines VALUES (?,?,?,?,?,?,?,?,?)", box_lines
+                )
+                cur.execute("COMMIT")
+            except BaseException:
+                cur.execute("ROLLBACK")
+                raise
+        return len(teams) + len(events) + len(competitors) + len(standings) + len(box_lines)
+
+    def query(self, sql: str, params: tuple = ()) -> list[dict]:
+        """Run a read query and return rows as dicts."""
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def events_on(self, league_id: str, game_date: str) -> list[dict]:
+        """Events for a league on a YYYYMMDD game date (US Eastern, as on ESPN's scoreboard)."""
+        return self.query(
+            "SELECT * FROM events WHERE league = ? AND game_date = ? ORDER BY start_time",
+            (league_id, game_date),
+        )
+
+    def team_games(self, league_id: str, team_id: str) -> list[dict]:
+        """A team's events with its score, most recent first."""
+        return self.query(
+            """
+            SELECT e.*, c.home_away, c.score, c.winner FROM competitors c
+            JOIN events e ON e.league = c.league AND e.event_id = c.event_id
+            WHERE c.league = ? AND c.team_id = ?
+            ORDER BY e.start_time DESC
+            """,
+            (league_id, team_id),
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+_databases: dict[Path, StatsDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(data_dir: Optional[Path] = None) -> StatsDatabase:
+    """Shared StatsDatabase for data_dir/stats.db (connection opened once per process)."""
+    db_path = (Path(data_dir or DATA_DIR) / "stats.db").resolve()
+    with _databases_lock:
+        if db_path not in _databases:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            _databases[db_path] = StatsDatabase(db_path)
+        return _databases[db_path]
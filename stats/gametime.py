@@ -0,0 +1,40 @@
+"""
+Scoreboard days and seasons.
+ESPN timestamps events in UTC but groups its scoreboards by US Eastern day, so the
+harvester, storage and web layers all convert through SCOREBOARD_TZ. Kept separate
+so storage code can use it without importing the harvester.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from config import SCOREBOARD_TIMEZONE
+
+try:
+    SCOREBOARD_TZ = ZoneInfo(SCOREBOARD_TIMEZONE)
+except ZoneInfoNotFoundError:  # no tz database (e.g. Windows without tzdata)
+    SCOREBOARD_TZ = timezone(timedelta(hours=-5))
+
+
+def event_day(event: dict) -> str:
+    """YYYYMMDD an event belongs to on ESPN's scoreboard (dates are UTC, days are US Eastern)."""
+    value = event.get("date", "")
+    try:
+        when = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value[:10].replace("-", "")
+    return when.astimezone(SCOREBOARD_TZ).strftime("%Y%m%d")
+
+
+def get_season_year(league_id: str, date: Optional[datetime] = None) -> int:
+    """ESPN uses season start year. NBA/NHL start Oct, NFL Sep, MLB Apr."""
+    date = date or datetime.now()
+    y, m = date.year, date.month
+    if league_id in ("nba", "nhl"):
+        return y if m >= 10 else y - 1  # Season starts Oct
+    if league_id == "nfl":
+        return y if m >= 9 else y - 1  # Season starts Sep
+    if league_id == "mlb":
+        return y if m >= 4 else y - 1  # Season starts Apr
+    return y
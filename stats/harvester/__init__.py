@@ -3,6 +3,6 @@ Sports statistics harvester package.
 Harvests data from NBA, NHL, NFL, and MLB via ESPN API.
 """
 
-from .espn_harvester import ESPNHarvester
+from .espn_harvester import NOT_MODIFIED, ESPNHarvester
 
-__all__ = ["ESPNHarvester"]
+__all__ = ["ESPNHarvester", "NOT_MODIFIED"]
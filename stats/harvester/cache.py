@@ -0,0 +1,145 @@
+"""
+Two-tier response cache for live ESPN fetches.
+An in-memory LRU, bounded by the bytes of its entries' JSON, sits in front of an
+on-disk tier (data/http_cache/), so entries survive restarts and are shared by every
+process using the data dir. Each entry carries its own TTL, finite even for data
+that never changes, so prune() eventually removes every entry.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+from config import HTTP_CACHE_MAX_STALE, HTTP_CACHE_MEMORY_BYTES
+from jsonio import atomic_write, dumps, loads, read_json
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """A cached response body, when it was fetched, how long it stays fresh and its size on disk."""
+
+    __slots__ = ("data", "fetched_at", "ttl", "size")
+
+    def __init__(self, data: Any, fetched_at: float, ttl: Optional[float], size: int = 0):
+        self.data = data
+        self.fetched_at = fetched_at
+        # None was "forever" in older cache files; such entries are now simply stale
+        self.ttl = ttl or 0.0
+        self.size = size
+
+    def fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) - self.fetched_at < self.ttl
+
+    def usable(self, now: Optional[float] = None) -> bool:
+        """Fresh, or stale but young enough to serve while a refresh runs."""
+        return (now or time.time()) - self.fetched_at < self.ttl + HTTP_CACHE_MAX_STALE
+
+
+class ResponseCache:
+    """URL -> CacheEntry, memory LRU over a disk tier. Thread-safe."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int = HTTP_CACHE_MEMORY_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._memory: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def _drop(self, url: str) -> None:
+        entry = self._memory.pop(url, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _remember(self, url: str, entry: CacheEntry) -> None:
+        self._drop(url)
+        if entry.size > self.max_bytes:
+            return
+        self._memory[url] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._memory)))
+            self.evictions += 1
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Cached entry (fresh or stale) or None. A stale memory entry is rechecked on disk,
+        where another process may already have stored a newer copy."""
+        with self._lock:
+            memory = self._memory.get(url)
+            if memory is not None and memory.fresh():
+                self._memory.move_to_end(url)
+                self.hits += 1
+                return memory
+        path = self._path(url)
+        try:
+            body = path.read_bytes()
+            raw = loads(body)
+            entry = CacheEntry(raw["data"], raw["fetched_at"], raw["ttl"], len(body))
+        except FileNotFoundError:
+            entry = None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Ignoring unreadable cache entry %s: %s", path, e)
+            entry = None
+        with self._lock:
+            if memory is not None and (entry is None or memory.fetched_at >= entry.fetched_at):
+                self.hits += 1
+                return memory
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(url, entry)
+            return entry
+
+    def put(self, url: str, data: Any, ttl: float) -> CacheEntry:
+        fetched_at = time.time()
+        body = dumps({"url": url, "fetched_at": fetched_at, "ttl": ttl, "data": data})
+        entry = CacheEntry(data, fetched_at, ttl, len(body))
+        path = self._path(url)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(path, body)
+        except OSError as e:
+            logger.warning("Could not write cache entry for %s: %s", url, e)
+        with self._lock:
+            self._remember(url, entry)
+        return entry
+
+    def prune(self) -> int:
+        """Delete disk entries too old to serve even as stale. Returns number removed."""
+        removed = 0
+        now = time.time()
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                raw = read_json(path)
+                if CacheEntry(None, raw["fetched_at"], raw["ttl"]).usable(now):
+                    continue
+            except (OSError, ValueError, KeyError):
+                pass
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._memory),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
@@ -5,10 +5,10 @@ Uses undocumented ESPN API - no authentication required.
 
 import json
 import logging
-import time
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Hashable, Optional
 
 import requests
 
@@ -16,20 +16,92 @@ from config import (
     ESPN_BASE_URL,
     ESPN_CORE_URL,
     LEAGUES,
-    REQUEST_DELAY,
+    HTTP_CACHE_TTLS,
+    PAGE_FETCH_DEADLINE,
+    PAGE_FETCH_WORKERS,
     REQUEST_TIMEOUT,
+    SCOREBOARD_LIVE_INTERVAL,
+    SCOREBOARD_RANGE_CHUNK_DAYS,
+    SCOREBOARD_RANGE_LIMIT,
 )
+from gametime import SCOREBOARD_TZ, event_day
+
+from .cache import ResponseCache
+from .transport import HostRateLimiter, SingleFlight, ValidatorStore, WorkerPool, build_session
 
 logger = logging.getLogger(__name__)
 
 
+class _NotModified:
+    """Sentinel for a conditional GET answered with 304. Falsy, so `if data:` save paths skip it."""
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __repr__(self) -> str:
+        return "NOT_MODIFIED"
+
+
+NOT_MODIFIED = _NotModified()
+
+
+def _competition_status(state: str, competitors: list[dict]) -> tuple[str, dict[str, str]]:
+    scores = {str(c.get("id", i)): str(c.get("score", "")) for i, c in enumerate(competitors)}
+    return state, scores
+
+
+def event_status(event: dict) -> tuple[str, dict[str, str]]:
+    """(state, competitor_id -> score) for a scoreboard event. State is 'pre', 'in' or 'post'."""
+    comp = (event.get("competitions") or [{}])[0]
+    status = event.get("status") or comp.get("status") or {}
+    return _competition_status(status.get("type", {}).get("state", ""), comp.get("competitors", []))
+
+
+def summary_status(summary: dict) -> tuple[str, dict[str, str]]:
+    """(state, competitor_id -> score) from a game summary's header."""
+    comp = ((summary.get("header") or {}).get("competitions") or [{}])[0]
+    status = comp.get("status") or {}
+    return _competition_status(status.get("type", {}).get("state", ""), comp.get("competitors", []))
+
+
+def scoreboard_final(scoreboard: Optional[dict], date_str: str) -> bool:
+    """Whether a day's scoreboard can no longer change: a past day (US Eastern) whose games are all final."""
+    states = [event_status(e)[0] for e in (scoreboard or {}).get("events", [])]
+    today = datetime.now(SCOREBOARD_TZ).strftime("%Y%m%d")
+    return bool(states) and all(s == "post" for s in states) and date_str < today
+
+
+def summary_needs_refresh(event: dict, stored_summary: Optional[dict]) -> bool:
+    """
+    Whether a scoreboard event's summary must be (re)fetched given the stored copy.
+    Final summaries are immutable; live games always refresh; otherwise only on a change.
+    """
+    if not stored_summary:
+        return True
+    stored_state, stored_scores = summary_status(stored_summary)
+    if stored_state == "post":
+        return False
+    state, scores = event_status(event)
+    return state == "in" or (state, scores) != (stored_state, stored_scores)
+
+
 class ESPNHarvester:
     """Harvests sports statistics from ESPN API for all major US leagues."""
 
     def __init__(self, data_dir: Optional[Path] = None):
         self.base_url = ESPN_BASE_URL
         self.data_dir = data_dir or Path(__file__).parent.parent / "data"
-        self.session = requests.Session()
+        self.session = build_session()
+        self.rate_limiter = HostRateLimiter()
+        self.pool = WorkerPool()
+        # Web pages' fan_out calls get their own bounded pool: a slow page can't starve
+        # harvests and background refreshes, and their backlog can't delay a page
+        self.page_pool = WorkerPool(PAGE_FETCH_WORKERS, name="espn-page")
+        self.validators = ValidatorStore(Path(self.data_dir) / "http_validators.json")
+        self.cache = ResponseCache(Path(self.data_dir) / "http_cache")
+        self.flights = SingleFlight()
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
         self.session.headers.update(
             {
                 "User-Agent": "SportsStatsHarvester/1.0 (Website Builder)",
@@ -37,12 +109,39 @@ class ESPNHarvester:
             }
         )
 
-    def _fetch(self, url: str) -> Optional[dict[str, Any]]:
-        """Fetch JSON from URL with error handling."""
+    def _fetch(
+        self, url: str, conditional: bool = False, remember_validators: bool = False
+    ) -> Optional[dict[str, Any]]:
+        """
+        Fetch JSON from URL with error handling. Waits for the host's rate limit first.
+        With conditional=True, sends stored ETag/Last-Modified validators and returns
+        NOT_MODIFIED on a 304 so the caller can skip decoding and saving.
+        remember_validators stores the response's validators for a later conditional fetch;
+        only pass it (conditional implies it) when the payload is saved, or a later 304 would
+        keep a file older than the validators.
+        Concurrent identical fetches are coalesced into one request whose parsed result
+        is shared (callers must not mutate it); see self.flights.stats().
+        """
+        return self.flights.do(
+            (url, conditional, remember_validators),
+            lambda: self._request(url, conditional, remember_validators),
+        )
+
+    def _request(
+        self, url: str, conditional: bool, remember_validators: bool
+    ) -> Optional[dict[str, Any]]:
+        self.rate_limiter.acquire(url)
+        headers = self.validators.request_headers(url) if conditional else None
         try:
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+            response = self.session.get(url, timeout=REQUEST_TIMEOUT, headers=headers)
+            if conditional and response.status_code == 304:
+                logger.debug("Not modified: %s", url)
+                return NOT_MODIFIED
             response.raise_for_status()
-            return response.json()
+            data = response.json()
+            if conditional or remember_validators:
+                self.validators.update(url, response)
+            return data
         except requests.RequestException as e:
             logger.error("Request failed for %s: %s", url, e)
             return None
@@ -50,6 +149,67 @@ class ESPNHarvester:
             logger.error("Invalid JSON from %s: %s", url, e)
             return None
 
+    def _cached_fetch(
+        self,
+        url: str,
+        ttl: float | Callable[[dict], float],
+        stale_ok: bool = True,
+    ) -> Optional[dict[str, Any]]:
+        """
+        _fetch through the response cache. ttl is seconds or a function of the response.
+        Fresh entries are returned as-is; stale ones are returned at once while
+        one background refresh per URL runs (stale-while-revalidate), unless stale_ok is False
+        (harvests, which store the result). If ESPN fails, pages still get the last good copy;
+        with stale_ok False the failure is returned as None so a harvest keeps its stored file
+        and reports nothing saved.
+        """
+        entry = self.cache.get(url)
+        if entry is not None and entry.fresh():
+            return entry.data
+        if stale_ok and entry is not None and entry.usable():
+            self._refresh_in_background(url, ttl)
+            return entry.data
+        data = self._fetch(url)
+        if data is None:
+            return entry.data if stale_ok and entry is not None else None
+        self.cache.put(url, data, ttl(data) if callable(ttl) else ttl)
+        return data
+
+    def _refresh_in_background(self, url: str, ttl: float | Callable[[dict], float]) -> None:
+        with self._refresh_lock:
+            if url in self._refreshing:
+                return
+            self._refreshing.add(url)
+
+        def refresh():
+            try:
+                data = self._fetch(url)
+                if data is not None:
+                    self.cache.put(url, data, ttl(data) if callable(ttl) else ttl)
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(url)
+
+        self.pool.submit(refresh)
+
+    def gather(self, calls: dict[Hashable, Callable[[], Any]]) -> dict[Hashable, Any]:
+        """
+        Run independent harvest calls concurrently on the shared pool.
+        Returns key -> result; the per-host rate limit still applies to every request.
+        """
+        return self.pool.gather(calls)
+
+    def fan_out(
+        self, calls: dict[Hashable, Callable[[], Any]], deadline: float = PAGE_FETCH_DEADLINE
+    ) -> dict[Hashable, Any]:
+        """
+        Issue a page's independent upstream calls in parallel under one shared deadline
+        (seconds), so latency is the slowest call rather than the sum. Calls that fail or
+        miss the deadline come back as None; callers render whatever arrived.
+        Runs on page_pool, apart from the harvest pool.
+        """
+        return self.page_pool.fan_out(calls, deadline)
+
     def _get_league_path(self, league_id: str) -> str:
         """Get sport/league path for ESPN API."""
         if league_id not in LEAGUES:
@@ -57,28 +217,39 @@ class ESPNHarvester:
         cfg = LEAGUES[league_id]
         return f"{cfg['sport']}/{cfg['league']}"
 
-    def harvest_teams(self, league_id: str) -> Optional[dict]:
-        """Harvest all teams for a league."""
+    def harvest_teams(
+        self, league_id: str, conditional: bool = False, remember_validators: bool = False
+    ) -> Optional[dict]:
+        """
+        Harvest all teams for a league. Callers that save the payload pass
+        remember_validators=True (implied by conditional); see _fetch.
+        """
         path = self._get_league_path(league_id)
         url = f"{self.base_url}/{path}/teams"
         logger.info("Harvesting teams for %s", league_id.upper())
-        data = self._fetch(url)
-        time.sleep(REQUEST_DELAY)
-        return data
+        return self._fetch(url, conditional=conditional, remember_validators=remember_validators)
 
-    def harvest_standings(self, league_id: str, season: Optional[int] = None) -> Optional[dict]:
+    def harvest_standings(
+        self,
+        league_id: str,
+        season: Optional[int] = None,
+        conditional: bool = False,
+        remember_validators: bool = False,
+    ) -> Optional[dict]:
         """Harvest standings for a league."""
         path = self._get_league_path(league_id)
         url = f"{self.base_url}/{path}/standings"
         if season:
             url += f"?season={season}"
         logger.info("Harvesting standings for %s (season=%s)", league_id.upper(), season)
-        data = self._fetch(url)
-        time.sleep(REQUEST_DELAY)
-        return data
+        return self._fetch(url, conditional=conditional, remember_validators=remember_validators)
 
     def harvest_scoreboard(
-        self, league_id: str, date: Optional[datetime] = None
+        self,
+        league_id: str,
+        date: Optional[datetime] = None,
+        conditional: bool = False,
+        remember_validators: bool = False,
     ) -> Optional[dict]:
         """Harvest scoreboard (games) for a league on a given date."""
         path = self._get_league_path(league_id)
@@ -87,23 +258,40 @@ class ESPNHarvester:
             date_str = date.strftime("%Y%m%d")
             url += f"?dates={date_str}"
         logger.info("Harvesting scoreboard for %s (date=%s)", league_id.upper(), date)
-        data = self._fetch(url)
-        time.sleep(REQUEST_DELAY)
-        return data
+        return self._fetch(url, conditional=conditional, remember_validators=remember_validators)
+
+    def fetch_scoreboard(self, league_id: str, date: datetime) -> Optional[dict]:
+        """
+        Scoreboard for a date (live, cached). A past date whose games are all final never
+        changes and is cached for a day (the caller stores it); a day with games in progress
+        refreshes at the live cadence.
+        """
+        path = self._get_league_path(league_id)
+        date_str = date.strftime("%Y%m%d")
+        url = f"{self.base_url}/{path}/scoreboard?dates={date_str}"
+
+        def ttl(data: dict) -> float:
+            if scoreboard_final(data, date_str):
+                return HTTP_CACHE_TTLS["final_scoreboard"]
+            if any(event_status(e)[0] == "in" for e in data.get("events", [])):
+                return SCOREBOARD_LIVE_INTERVAL
+            return HTTP_CACHE_TTLS["scoreboard"]
+
+        return self._cached_fetch(url, ttl)
 
     def harvest_schedule(
         self,
         league_id: str,
         season: Optional[int] = None,
         limit: int = 100,
+        conditional: bool = False,
+        remember_validators: bool = False,
     ) -> Optional[dict]:
         """Harvest schedule for a league. Uses scoreboard endpoint - ESPN returns 500 with season param, so we omit it."""
         path = self._get_league_path(league_id)
         url = f"{self.base_url}/{path}/scoreboard?limit={limit}"
         logger.info("Harvesting schedule for %s", league_id.upper())
-        data = self._fetch(url)
-        time.sleep(REQUEST_DELAY)
-        return data
+        return self._fetch(url, conditional=conditional, remember_validators=remember_validators)
 
     def harvest_game_summary(
         self, league_id: str, event_id: str
@@ -112,53 +300,56 @@ class ESPNHarvester:
         path = self._get_league_path(league_id)
         url = f"{self.base_url}/{path}/summary?event={event_id}"
         logger.info("Harvesting game summary for %s event %s", league_id.upper(), event_id)
-        data = self._fetch(url)
-        time.sleep(REQUEST_DELAY)
-        return data
+        return self._fetch(url)
 
     def harvest_game_summaries_from_scoreboard(
         self,
         league_id: str,
         date: Optional[datetime] = None,
         max_games: int = 20,
+        scoreboard: Optional[dict] = None,
+        stored: Optional[dict[str, dict]] = None,
     ) -> list[tuple[str, dict]]:
-        """Harvest summaries for all games on a scoreboard. Returns list of (event_id, summary)."""
-        scoreboard = self.harvest_scoreboard(league_id, date)
+        """
+        Harvest summaries for all games on a scoreboard. Returns list of (event_id, summary).
+        Pass an already-harvested scoreboard to avoid fetching it again.
+        Incremental mode: pass stored (event_id -> previously saved summary) and only games
+        that are in progress or whose status/score changed are fetched; finals are immutable.
+        """
+        scoreboard = scoreboard or self.harvest_scoreboard(league_id, date)
         if not scoreboard:
             return []
-        events = scoreboard.get("events", [])
-        result = []
-        for event in events[:max_games]:
-            event_id = event.get("id")
-            if event_id:
-                event_id_str = str(event_id)
-                summary = self.harvest_game_summary(league_id, event_id_str)
-                if summary:
-                    result.append((event_id_str, summary))
-        return result
+        events = [e for e in scoreboard.get("events", [])[:max_games] if e.get("id")]
+        if stored is not None:
+            events = [e for e in events if summary_needs_refresh(e, stored.get(str(e["id"])))]
+        event_ids = [str(e["id"]) for e in events]
+        summaries = self.gather(
+            {eid: (lambda eid=eid: self.harvest_game_summary(league_id, eid)) for eid in event_ids}
+        )
+        return [(eid, summaries[eid]) for eid in event_ids if summaries.get(eid)]
 
     def fetch_team_detail(
-        self, league_id: str, team_id: str, season: Optional[int] = None
+        self, league_id: str, team_id: str, season: Optional[int] = None, stale_ok: bool = True
     ) -> Optional[dict]:
         """Fetch team detail with roster and record (live, not harvested)."""
         path = self._get_league_path(league_id)
         url = f"{self.base_url}/{path}/teams/{team_id}?enable=roster,stats"
         if season:
             url += f"&season={season}"
-        return self._fetch(url)
+        return self._cached_fetch(url, HTTP_CACHE_TTLS["team_detail"], stale_ok)
 
     def fetch_team_statistics(
-        self, league_id: str, team_id: str, season: Optional[int] = None
+        self, league_id: str, team_id: str, season: Optional[int] = None, stale_ok: bool = True
     ) -> Optional[dict]:
         """Fetch team statistics with full stat breakdown (live)."""
         path = self._get_league_path(league_id)
         url = f"{self.base_url}/{path}/teams/{team_id}/statistics"
         if season:
             url += f"?season={season}"
-        return self._fetch(url)
+        return self._cached_fetch(url, HTTP_CACHE_TTLS["team_statistics"], stale_ok)
 
     def fetch_athlete_info(
-        self, league_id: str, player_id: str, season: Optional[int] = None
+        self, league_id: str, player_id: str, season: Optional[int] = None, stale_ok: bool = True
     ) -> Optional[dict]:
         """Fetch athlete/player info (name, headshot, team, etc.) from sports.core."""
         if league_id not in LEAGUES:
@@ -168,7 +359,7 @@ class ESPNHarvester:
         league = cfg["league"]
         season = season or datetime.now().year
         url = f"{ESPN_CORE_URL}/{sport}/leagues/{league}/seasons/{season}/athletes/{player_id}"
-        return self._fetch(url)
+        return self._cached_fetch(url, HTTP_CACHE_TTLS["athlete_info"], stale_ok)
 
     def fetch_player_statistics(
         self,
@@ -176,6 +367,7 @@ class ESPNHarvester:
         player_id: str,
         season: Optional[int] = None,
         season_type: int = 2,
+        stale_ok: bool = True,
     ) -> Optional[dict]:
         """Fetch player stats with league rankings from sports.core API (live)."""
         if league_id not in LEAGUES:
@@ -185,7 +377,56 @@ class ESPNHarvester:
         league = cfg["league"]
         season = season or datetime.now().year
         url = f"{ESPN_CORE_URL}/{sport}/leagues/{league}/seasons/{season}/types/{season_type}/athletes/{player_id}/statistics"
-        return self._fetch(url)
+        return self._cached_fetch(url, HTTP_CACHE_TTLS["player_statistics"], stale_ok)
+
+    def harvest_scoreboard_range(
+        self,
+        league_id: str,
+        start_date: datetime,
+        end_date: datetime,
+        chunk_days: int = SCOREBOARD_RANGE_CHUNK_DAYS,
+    ) -> dict[str, dict]:
+        """
+        Harvest scoreboards for a date range with as few requests as possible.
+        ESPN accepts dates=YYYYMMDD-YYYYMMDD; the range is split into chunks of chunk_days,
+        fetched concurrently, and events are bucketed back into one scoreboard per day.
+        Returns YYYYMMDD -> scoreboard for every day covered by a successful chunk.
+        """
+        path = self._get_league_path(league_id)
+        start, end = start_date.date(), end_date.date()
+        chunks = []
+        while start <= end:
+            chunk_end = min(end, start + timedelta(days=chunk_days - 1))
+            chunks.append((start, chunk_end))
+            start = chunk_end + timedelta(days=1)
+
+        def fetch_chunk(first, last):
+            url = (
+                f"{self.base_url}/{path}/scoreboard"
+                f"?dates={first:%Y%m%d}-{last:%Y%m%d}&limit={SCOREBOARD_RANGE_LIMIT}"
+            )
+            logger.info("Harvesting scoreboard for %s (%s to %s)", league_id.upper(), first, last)
+            return self._fetch(url)
+
+        results = self.gather({c: (lambda c=c: fetch_chunk(*c)) for c in chunks})
+        days: dict[str, dict] = {}
+        for (first, last), data in sorted(results.items()):
+            if not data:
+                continue
+            shared = {k: v for k, v in data.items() if k not in ("events", "day")}
+            buckets: dict[str, list] = {}
+            day = first
+            while day <= last:
+                buckets[f"{day:%Y%m%d}"] = []
+                day += timedelta(days=1)
+            for event in data.get("events", []):
+                key = event_day(event)
+                if key in buckets:
+                    buckets[key].append(event)
+            for key, events in buckets.items():
+                iso_day = f"{key[:4]}-{key[4:6]}-{key[6:]}"
+                days[key] = {**shared, "day": {"date": iso_day}, "events": events}
+        return days
 
     def harvest_date_range(
         self,
@@ -193,15 +434,9 @@ class ESPNHarvester:
         start_date: datetime,
         end_date: datetime,
     ) -> list[dict]:
-        """Harvest scoreboards for a date range."""
-        results = []
-        current = start_date
-        while current <= end_date:
-            data = self.harvest_scoreboard(league_id, current)
-            if data:
-                results.append(data)
-            current += timedelta(days=1)
-        return results
+        """Harvest scoreboards for a date range. Returns one scoreboard per day harvested, in date order."""
+        days = self.harvest_scoreboard_range(league_id, start_date, end_date)
+        return [days[key] for key in sorted(days)]
 
     def harvest_all_leagues(
         self,
@@ -215,30 +450,25 @@ class ESPNHarvester:
         """
         data_types = data_types or ["teams", "standings", "scoreboard"]
         date = date or datetime.now()
-        all_data: dict[str, dict[str, Any]] = {}
-
+        calls: dict[Hashable, Callable[[], Any]] = {}
         for league_id in LEAGUES:
-            all_data[league_id] = {}
             league_season = season or date.year
-
             if "teams" in data_types:
-                data = self.harvest_teams(league_id)
-                if data:
-                    all_data[league_id]["teams"] = data
-
+                calls[(league_id, "teams")] = lambda lg=league_id: self.harvest_teams(lg)
             if "standings" in data_types:
-                data = self.harvest_standings(league_id, league_season)
-                if data:
-                    all_data[league_id]["standings"] = data
-
+                calls[(league_id, "standings")] = (
+                    lambda lg=league_id, s=league_season: self.harvest_standings(lg, s)
+                )
             if "scoreboard" in data_types:
-                data = self.harvest_scoreboard(league_id, date)
-                if data:
-                    all_data[league_id]["scoreboard"] = data
-
+                calls[(league_id, "scoreboard")] = lambda lg=league_id: self.harvest_scoreboard(lg, date)
             if "schedule" in data_types:
-                data = self.harvest_schedule(league_id, league_season)
-                if data:
-                    all_data[league_id]["schedule"] = data
+                calls[(league_id, "schedule")] = (
+                    lambda lg=league_id, s=league_season: self.harvest_schedule(lg, s)
+                )
 
+        results = self.gather(calls)
+        all_data: dict[str, dict[str, Any]] = {league_id: {} for league_id in LEAGUES}
+        for (league_id, data_type), data in results.items():
+            if data:
+                all_data[league_id][data_type] = data
         return all_data
@@ -0,0 +1,283 @@
+"""
+HTTP transport for the ESPN harvester.
+Pooled keep-alive session, per-host token-bucket rate limiting, a shared
+thread pool so independent requests can overlap, and persisted validators
+for conditional GETs.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import HTTP_POOL_SIZE, MAX_CONCURRENT_REQUESTS, RATE_LIMIT_BURST, REQUESTS_PER_SECOND
+from jsonio import read_json, write_json
+from locks import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket. acquire() blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per host, so each upstream gets its own requests-per-second budget."""
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND, burst: float = RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+def build_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """Session with a keep-alive connection pool large enough for the worker pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class WorkerPool:
+    """
+    Lazily created thread pool for upstream calls.
+    Calls made from inside a pool thread run inline, so nested gather() never deadlocks.
+    """
+
+    def __init__(self, max_workers: int = MAX_CONCURRENT_REQUESTS, name: str = "espn-fetch"):
+        self.max_workers = max_workers
+        self.name = name
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            return self._executor
+
+    def _run_in_worker(self, fn: Callable[[], Any]) -> Any:
+        self._local.in_worker = True
+        try:
+            return fn()
+        finally:
+            self._local.in_worker = False
+
+    def in_worker(self) -> bool:
+        return getattr(self._local, "in_worker", False)
+
+    def submit(self, fn: Callable[[], Any]) -> None:
+        """Run a zero-arg callable in the background; exceptions are logged, not raised."""
+
+        def run():
+            try:
+                self._run_in_worker(fn)
+            except Exception:
+                logger.exception("Background upstream call failed")
+
+        self._get_executor().submit(run)
+
+    def gather(self, calls: dict[Hashable, Callable[[], Any]]) -> dict[Hashable, Any]:
+        """Run zero-arg callables concurrently. Returns key -> result (exceptions propagate)."""
+        if len(calls) <= 1 or self.max_workers <= 1 or self.in_worker():
+            return {key: fn() for key, fn in calls.items()}
+        executor = self._get_executor()
+        futures = {key: executor.submit(self._run_in_worker, fn) for key, fn in calls.items()}
+        return {key: future.result() for key, future in futures.items()}
+
+    def fan_out(
+        self, calls: dict[Hashable, Callable[[], Any]], timeout: float
+    ) -> dict[Hashable, Any]:
+        """
+        Run zero-arg callables concurrently under one shared deadline (seconds).
+        Returns key -> result for every call that finished in time; calls that raised or
+        missed the deadline map to None. Calls still queued at the deadline are cancelled;
+        ones already running finish in the background.
+        """
+        deadline = time.monotonic() + timeout
+        if len(calls) <= 1 or self.max_workers <= 1 or self.in_worker():
+            results = {}
+            for key, fn in calls.items():
+                if time.monotonic() >= deadline:
+                    results[key] = None
+                    continue
+                try:
+                    results[key] = fn()
+                except Exception as e:
+                    logger.warning("Upstream call %s failed: %s", key, e)
+                    results[key] = None
+            return results
+        executor = self._get_executor()
+        futures = {key: executor.submit(self._run_in_worker, fn) for key, fn in calls.items()}
+        wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+        results = {}
+        for key, future in futures.items():
+            if not future.done():
+                future.cancel()
+                logger.warning("Upstream call %s missed the %.1fs deadline", key, timeout)
+                results[key] = None
+            elif future.exception() is not None:
+                logger.warning("Upstream call %s failed: %s", key, future.exception())
+                results[key] = None
+            else:
+                results[key] = future.result()
+        return results
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls: while one call for a key runs, other callers
+    with the same key wait for it and share its result instead of issuing their own.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._inflight: dict[Hashable, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """fn() for the first caller with this key; concurrent callers get the same result."""
+        with self._lock:
+            self.calls += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = {"done": threading.Event(), "result": None, "error": None}
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight["done"].wait()
+            if flight["error"] is not None:
+                raise flight["error"]
+            return flight["result"]
+        try:
+            flight["result"] = fn()
+            return flight["result"]
+        except BaseException as e:
+            flight["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight["done"].set()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+
+class ValidatorStore:
+    """
+    Per-URL HTTP validators (ETag / Last-Modified) persisted as a small JSON file,
+    so conditional GETs survive restarts. Processes sharing the file (web workers, the
+    scheduler, a manual run) merge their changes into it under a file lock.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+        self._validators: dict[str, dict[str, str]] = {}
+        if self.path.exists():
+            try:
+                self._validators = read_json(self.path)
+            except (OSError, ValueError) as e:
+                logger.warning("Ignoring unreadable validator store %s: %s", self.path, e)
+
+    def request_headers(self, url: str) -> dict[str, str]:
+        """Conditional request headers for a URL (empty if we have no validators)."""
+        with self._lock:
+            entry = self._validators.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def update(self, url: str, response: requests.Response) -> None:
+        """Remember validators from a 200 response (or forget them if the server sent none)."""
+        entry = {}
+        if response.headers.get("ETag"):
+            entry["etag"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            entry["last_modified"] = response.headers["Last-Modified"]
+        with self._lock:
+            if self._validators.get(url) == (entry or None):
+                return
+            if entry:
+                self._validators[url] = entry
+            else:
+                self._validators.pop(url, None)
+            self._save(url, entry)
+
+    def _save(self, url: str, entry: dict[str, str]) -> None:
+        """
+        Re-read the file and apply this one URL's change under the file lock, so entries other
+        processes wrote since we loaded it are kept (and picked up). A failed save is logged:
+        validators are an optimization and must never fail the fetch that produced them.
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._file_lock:
+                if not self._file_lock.held:
+                    raise OSError(f"could not lock {self._file_lock.path}")
+                try:
+                    validators = read_json(self.path) if self.path.exists() else {}
+                except ValueError:
+                    validators = {}
+                if entry:
+                    validators[url] = entry
+                else:
+                    validators.pop(url, None)
+                write_json(self.path, validators)
+            self._validators = validators
+        except OSError as e:
+            logger.warning("Could not save validators to %s: %s", self.path, e)
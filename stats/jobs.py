@@ -0,0 +1,190 @@
+"""
+Harvest jobs for /api/harvest.
+Web workers only queue a job: its status is written to data/jobs/{job_id}.json and
+data/jobs/active.json names the job that is queued or running, so requests made
+meanwhile join it. The scheduler leader (main.py --daemon, or the scheduler thread
+of a non-gevent web server) runs the queued job with its own harvester, so jobs
+share its rate limit and connection pool and never run inside a gevent worker.
+Both sides change these files under data/jobs/queue.lock.
+"""
+
+import logging
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from config import DATA_DIR, HARVEST_JOB_HISTORY, LEAGUES
+from harvester.espn_harvester import ESPNHarvester
+from jsonio import read_json, write_json
+from locks import FileLock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TYPES = ["teams", "standings", "scoreboard", "schedule"]
+
+
+class HarvestJobs:
+    """Harvest job queue in data/jobs/. Safe across threads and processes."""
+
+    def __init__(self, data_dir: Optional[Path] = None):
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self.job_dir = self.data_dir / "jobs"
+        self.active_path = self.job_dir / "active.json"
+
+    def _lock(self) -> FileLock:
+        return FileLock(self.job_dir / "queue.lock")
+
+    def _read(self, job_id: str) -> Optional[dict[str, Any]]:
+        try:
+            return read_json(self.job_dir / f"{job_id}.json")
+        except (OSError, ValueError):
+            return None
+
+    def _active(self) -> Optional[dict[str, Any]]:
+        """The queued or running job, if any. Caller holds the queue lock."""
+        try:
+            job_id = read_json(self.active_path)["job_id"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        job = self._read(job_id)
+        return job if job and job["status"] in ("queued", "running") else None
+
+    def submit(self, leagues: Optional[list[str]] = None, types: Optional[list[str]] = None) -> tuple[dict, bool]:
+        """
+        Queue a harvest, or join the one already queued/running.
+        Returns (job status, merged) where merged is True if an existing job was reused.
+        """
+        with self._lock():
+            job = self._active()
+            if job is not None:
+                job["requests"] += 1
+                self._persist(job)
+                return job, True
+            leagues = leagues or list(LEAGUES.keys())
+            types = types or DEFAULT_TYPES
+            job = {
+                "job_id": uuid.uuid4().hex[:12],
+                "status": "queued",
+                "leagues": leagues,
+                "types": types,
+                "requested_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "requests": 1,
+                "progress": {"done": 0, "total": len(leagues) * len(types)},
+                "league_seconds": {},
+                "files": [],
+                "files_saved": 0,
+                "error": None,
+            }
+            self._persist(job)
+            write_json(self.active_path, {"job_id": job["job_id"]})
+            return job, False
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Status of a job, or None if unknown."""
+        if not job_id.isalnum():
+            return None
+        return self._read(job_id)
+
+    def run_pending(self, harvester: ESPNHarvester) -> Optional[dict]:
+        """
+        Run the queued job, if any, with the caller's harvester (the scheduler leader's).
+        Returns the finished job's status, or None if nothing was queued.
+        """
+        if not self.active_path.exists():
+            return None
+        with self._lock():
+            job = self._active()
+            if job is None:
+                self.active_path.unlink(missing_ok=True)
+                return None
+            if job["status"] != "queued":
+                return None
+            job["status"] = "running"
+            job["started_at"] = datetime.now().isoformat()
+            self._persist(job)
+        status, error, seconds = self._run(job, harvester)
+        job.update(status=status, error=error, seconds=seconds)
+        job["finished_at"] = datetime.now().isoformat()
+        with self._lock():
+            self._save(job)
+            self.active_path.unlink(missing_ok=True)
+            self._prune()
+        return job
+
+    def recover(self) -> None:
+        """
+        Fail a job left running by a scheduler that exited mid-run, so new requests
+        don't keep joining it. Only the scheduler leader calls this, before run_pending.
+        """
+        with self._lock():
+            job = self._active()
+            if job is not None and job["status"] == "running":
+                job.update(status="failed", error="interrupted: the scheduler process exited")
+                job["finished_at"] = datetime.now().isoformat()
+                self._persist(job)
+                self.active_path.unlink(missing_ok=True)
+
+    def _persist(self, job: dict) -> None:
+        try:
+            self.job_dir.mkdir(parents=True, exist_ok=True)
+            write_json(self.job_dir / f"{job['job_id']}.json", job)
+        except OSError as e:
+            logger.warning("Could not write job status %s: %s", job["job_id"], e)
+
+    def _save(self, job: dict) -> None:
+        """Persist a running job, keeping requests that joined it from other processes."""
+        stored = self._read(job["job_id"]) or {}
+        job["requests"] = max(job["requests"], stored.get("requests", 0))
+        self._persist(job)
+
+    def _prune(self) -> None:
+        """Keep status files for the last HARVEST_JOB_HISTORY jobs."""
+        files = sorted(
+            (p for p in self.job_dir.glob("*.json") if p != self.active_path),
+            key=lambda p: p.stat().st_mtime,
+        )
+        for path in files[:-HARVEST_JOB_HISTORY]:
+            path.unlink(missing_ok=True)
+
+    def _run(self, job: dict, harvester: ESPNHarvester) -> tuple[str, Optional[str], float]:
+        """Run the harvest; returns (status, error, seconds)."""
+        import main
+
+        start = time.monotonic()
+
+        def progress(league_id: str, data_type: str, saved: int) -> None:
+            job["progress"]["done"] += 1
+            job["league_seconds"][league_id] = round(time.monotonic() - start, 2)
+            if saved:
+                job["files"].append(f"{league_id}/{data_type}")
+                job["files_saved"] += saved
+            with self._lock():
+                self._save(job)
+
+        try:
+            # A harvest the scheduler finished after the job was requested already covers
+            # those leagues and types, so they are skipped
+            main.run_harvest(
+                leagues=job["leagues"], types=job["types"], output=self.data_dir, progress=progress,
+                harvester=harvester, skip_since=datetime.fromisoformat(job["requested_at"]),
+            )
+            status, error = "done", None
+        except Exception as e:
+            logger.exception("Harvest job %s failed", job["job_id"])
+            status, error = "failed", str(e)
+        return status, error, round(time.monotonic() - start, 2)
+
+
+_jobs: Optional[HarvestJobs] = None
+
+
+def get_jobs() -> HarvestJobs:
+    """The harvest job queue for DATA_DIR."""
+    global _jobs
+    if _jobs is None:
+        _jobs = HarvestJobs()
+    return _jobs
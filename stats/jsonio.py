@@ -0,0 +1,123 @@
+"""
+JSON encoding and file writes shared by storage and loader.
+Uses orjson when installed (much faster), falling back to the stdlib json module.
+Writes go through a temp file plus os.replace so readers never see a torn file.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional: br responses only when installed
+    brotli = None
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json(path: Path) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    """Write bytes to path atomically (temp file in the same directory, then os.replace)."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def gzip_path(path: Path) -> Path:
+    """Precompressed sibling of a JSON file: foo.json -> foo.json.gz"""
+    return Path(path).with_name(Path(path).name + ".gz")
+
+
+def write_json(path: Path, obj: Any, precompress: bool = False) -> bytes:
+    """
+    Atomically write obj as compact JSON; with precompress, also write a .json.gz sibling
+    that a server can send as-is with Content-Encoding: gzip. The sibling is written after
+    the primary file, so a reader of the sibling never sees a payload the JSON doesn't have
+    yet. Returns the encoded bytes.
+    """
+    data = dumps(obj)
+    atomic_write(path, data)
+    if precompress:
+        atomic_write(gzip_path(path), gzip_bytes(data))
+    return data
+
+
+def gzip_bytes(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def brotli_bytes(data: bytes) -> Optional[bytes]:
+    """Brotli-compressed data, or None when the brotli package isn't installed."""
+    return brotli.compress(data, quality=5) if brotli is not None else None
+
+
+class EncodedJSON:
+    """
+    A serialized JSON response body with its strong validator (ETag) and compressed
+    variants. Variants passed in (e.g. precompressed in a snapshot) are used as-is;
+    missing ones are compressed on first use and kept.
+    """
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str] = None,
+        gzip_body: Optional[bytes] = None,
+        br_body: Optional[bytes] = None,
+    ):
+        self.body = body
+        self.etag = etag or hashlib.sha256(body).hexdigest()[:20]
+        self._gzip = gzip_body
+        self._br = br_body
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_obj(cls, obj: Any) -> "EncodedJSON":
+        return cls(dumps(obj))
+
+    def gzip(self) -> bytes:
+        with self._lock:
+            if self._gzip is None:
+                self._gzip = gzip_bytes(self.body)
+            return self._gzip
+
+    def br(self) -> Optional[bytes]:
+        with self._lock:
+            if self._br is None:
+                self._br = brotli_bytes(self.body)
+            return self._br
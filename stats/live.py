@@ -0,0 +1,181 @@
+"""
+Live scoreboard push for /api/<league>/scoreboard/stream and the multi-league
+/api/scoreboard/stream (Server-Sent Events). One watcher thread per process,
+running only while a client is subscribed, notices when the harvester has written
+a new scoreboard, diffs it against the previous one and pushes only the events
+whose score, clock or status changed to every subscriber of that league. A client
+may subscribe to several leagues on one stream (every message names its league),
+so a page showing all leagues holds one connection instead of one per league.
+Subscribers are queues, not threads: under gunicorn's gevent worker each open
+stream is a greenlet, so thousands of idle connections cost little.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from config import LEAGUES, SSE_KEEPALIVE_INTERVAL, SSE_POLL_INTERVAL, SSE_QUEUE_SIZE
+from harvester.espn_harvester import event_status
+from jsonio import dumps
+from loader import load_scoreboard
+
+logger = logging.getLogger(__name__)
+
+
+def event_state(event: dict) -> dict[str, Any]:
+    """The live fields of a scoreboard event: status, clock, period and scores."""
+    comp = (event.get("competitions") or [{}])[0]
+    status = event.get("status") or comp.get("status") or {}
+    state, scores = event_status(event)
+    return {
+        "id": str(event.get("id")),
+        "state": state,
+        "detail": (status.get("type") or {}).get("shortDetail", ""),
+        "clock": status.get("displayClock", ""),
+        "period": status.get("period"),
+        "scores": scores,
+    }
+
+
+def scoreboard_states(scoreboard: Optional[dict]) -> dict[str, dict]:
+    return {
+        str(e["id"]): event_state(e) for e in (scoreboard or {}).get("events", []) if e.get("id")
+    }
+
+
+def sse_message(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {dumps(data).decode()}")
+    return "\n".join(lines) + "\n\n"
+
+
+def _close(q: queue.Queue) -> None:
+    """Replace a subscriber's backlog with the end-of-stream marker."""
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+    q.put_nowait(None)
+
+
+class ScoreboardBroadcaster:
+    """Fans scoreboard changes out to per-client queues. One instance per process."""
+
+    def __init__(self, poll_interval: float = SSE_POLL_INTERVAL):
+        self.poll_interval = poll_interval
+        self._subscribers: dict[str, set[queue.Queue]] = {league_id: set() for league_id in LEAGUES}
+        self._boards: dict[str, Any] = {}
+        self._states: dict[str, dict[str, dict]] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def subscribe(self, league_ids: list[str]) -> tuple[queue.Queue, dict[str, dict[str, dict]]]:
+        """
+        Register a client for one or more leagues. Returns its queue and, per league,
+        the current event states to send first.
+        """
+        q: queue.Queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+        with self._lock:
+            for league_id in league_ids:
+                self._subscribers[league_id].add(q)
+            if self._watcher is None or not self._watcher.is_alive():
+                self._watcher = threading.Thread(target=self._watch, name="scoreboard-watch", daemon=True)
+                self._watcher.start()
+        for league_id in league_ids:
+            self._refresh(league_id)
+        with self._lock:
+            return q, {league_id: dict(self._states.get(league_id, {})) for league_id in league_ids}
+
+    def unsubscribe(self, q: queue.Queue) -> None:
+        """Remove a client from every league it subscribed to."""
+        with self._lock:
+            for subs in self._subscribers.values():
+                subs.discard(q)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def _refresh(self, league_id: str) -> None:
+        """Diff the stored scoreboard against the last one seen and publish changed events."""
+        board = load_scoreboard(league_id)
+        with self._lock:
+            # The loader hands back the same object until the file (or snapshot) changes
+            if league_id in self._boards and board is self._boards[league_id]:
+                return
+            first = league_id not in self._boards
+            self._boards[league_id] = board
+            previous = self._states.get(league_id, {})
+            current = scoreboard_states(board)
+            self._states[league_id] = current
+            if first:
+                return
+            changed = [state for event_id, state in current.items() if previous.get(event_id) != state]
+            removed = [event_id for event_id in previous if event_id not in current]
+            if not changed and not removed:
+                return
+            self._version += 1
+            message = sse_message(
+                "update", {"league": league_id, "events": changed, "removed": removed}, self._version
+            )
+            subscribers = list(self._subscribers[league_id])
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # A client that stopped reading; drop it rather than buffer without bound
+                self.unsubscribe(q)
+                _close(q)
+
+    def _watch(self) -> None:
+        """Poll subscribed leagues until none have subscribers; subscribe() starts a new watcher then."""
+        while True:
+            with self._lock:
+                leagues = [league_id for league_id, subs in self._subscribers.items() if subs]
+                if not leagues:
+                    self._watcher = None
+                    return
+            for league_id in leagues:
+                try:
+                    self._refresh(league_id)
+                except Exception:
+                    logger.exception("Scoreboard watch failed for %s", league_id)
+            time.sleep(self.poll_interval)
+
+    def stream(self, league_ids: list[str]) -> Iterator[str]:
+        """SSE text for one client: a snapshot of every event per league, then only changes."""
+        q, states = self.subscribe(league_ids)
+        try:
+            yield "retry: 5000\n\n"
+            for league_id in league_ids:
+                yield sse_message("snapshot", {"league": league_id, "events": list(states[league_id].values())})
+            while True:
+                try:
+                    message = q.get(timeout=SSE_KEEPALIVE_INTERVAL)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(q)
+
+
+_broadcaster: Optional[ScoreboardBroadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> ScoreboardBroadcaster:
+    """The process-wide scoreboard broadcaster."""
+    global _broadcaster
+    with _broadcaster_lock:
+        if _broadcaster is None:
+            _broadcaster = ScoreboardBroadcaster()
+        return _broadcaster
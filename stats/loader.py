@@ -1,13 +1,116 @@
 """
 Data loader for website consumption.
 Import this module to load harvested sports statistics.
+Reads come from the shared mmapped snapshot (snapshot.py) when one is published,
+otherwise from the JSON files; either way parsed payloads are cached in-process
+and re-read only when a harvest replaces them.
 """
 
-import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
-from config import DATA_DIR
+from config import DATA_DIR, LOADER_CACHE_MAX_BYTES, SNAPSHOT_ENABLED
+from jsonio import EncodedJSON, loads
+from snapshot import SnapshotVersion, get_reader
+
+
+class PayloadCache:
+    """
+    Bounded LRU of parsed JSON files, keyed by path and validated by (mtime_ns, size),
+    so each file is parsed once per harvest rather than once per request.
+    Derived results (e.g. the flattened team list) are memoized on the same entry and
+    dropped with it. Cached objects are shared: callers must not mutate them.
+    """
+
+    def __init__(self, max_bytes: int = LOADER_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry["size"]
+
+    def _entry(self, path: Path) -> Optional[dict[str, Any]]:
+        key = str(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._drop(key)
+            return None
+        stamp = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["stamp"] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                payload = loads(f.read())
+        except FileNotFoundError:
+            return None
+        entry = {"stamp": (st.st_mtime_ns, st.st_size), "size": st.st_size, "payload": payload, "derived": {}}
+        with self._lock:
+            self._drop(key)
+            if entry["size"] <= self.max_bytes:
+                self._entries[key] = entry
+                self._bytes += entry["size"]
+                while self._bytes > self.max_bytes:
+                    self._drop(next(iter(self._entries)))
+                    self.evictions += 1
+        return entry
+
+    def get(self, path: Path) -> Optional[Any]:
+        """Parsed contents of a JSON file, or None if it doesn't exist."""
+        entry = self._entry(path)
+        return entry["payload"] if entry else None
+
+    def derived(self, path: Path, name: str, build: Callable[[Any], Any]) -> Optional[Any]:
+        """build(payload), computed once per version of the file."""
+        entry = self._entry(path)
+        if entry is None:
+            return None
+        derived = entry["derived"]
+        if name not in derived:
+            derived[name] = build(entry["payload"])
+        return derived[name]
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache = PayloadCache()
+
+
+def cache_stats() -> dict[str, int]:
+    """Hit/miss/eviction counters and size of the loader's payload cache."""
+    return _cache.stats()
 
 
 def get_data_dir(base_path: Optional[Path] = None) -> Path:
@@ -15,6 +118,32 @@ def get_data_dir(base_path: Optional[Path] = None) -> Path:
     return Path(base_path or DATA_DIR)
 
 
+def _snapshot(league_id: str, data_type: str, data_dir: Optional[Path] = None) -> Optional[SnapshotVersion]:
+    """Current shared snapshot if it holds this league/type, else None (read the file)."""
+    if not SNAPSHOT_ENABLED:
+        return None
+    snap = get_reader(get_data_dir(data_dir)).current()
+    return snap if snap is not None and snap.has(league_id, data_type) else None
+
+
+def load_league_encoded(
+    league_id: str, data_type: str, data_dir: Optional[Path] = None
+) -> Optional[EncodedJSON]:
+    """
+    A league's data (the payload's "data") as a ready-to-send response body with ETag and
+    compressed variants: zero-copy and precompressed from the shared snapshot, otherwise
+    encoded once per version of the file. None if nothing has been harvested.
+    """
+    snap = _snapshot(league_id, data_type, data_dir)
+    if snap is not None:
+        return snap.encoded(league_id, data_type)
+    return _cache.derived(
+        _data_path(league_id, data_type, data_dir),
+        "encoded",
+        lambda payload: EncodedJSON.from_obj(payload.get("data", payload)),
+    )
+
+
 def load_league_data(
     league_id: str,
     data_type: str,
@@ -28,17 +157,17 @@ def load_league_data(
         result = load_league_data("nba", "teams")
         teams = result["data"] if result else []
     """
-    base = get_data_dir(data_dir)
-    path = base / league_id / f"{data_type}.json"
-    if not path.exists():
-        return None
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
+    snap = _snapshot(league_id, data_type, data_dir)
+    if snap is not None:
+        return snap.payload(league_id, data_type)
+    return _cache.get(_data_path(league_id, data_type, data_dir))
 
 
-def load_teams(league_id: str, data_dir: Optional[Path] = None) -> list[dict]:
-    """Load teams for a league. Returns list of team objects."""
-    payload = load_league_data(league_id, "teams", data_dir)
+def _data_path(league_id: str, data_type: str, data_dir: Optional[Path] = None) -> Path:
+    return get_data_dir(data_dir) / league_id / f"{data_type}.json"
+
+
+def _flatten_teams(payload: Optional[dict]) -> list[dict]:
     if not payload:
         return []
     data = payload.get("data", {})
@@ -51,6 +180,26 @@ def load_teams(league_id: str, data_dir: Optional[Path] = None) -> list[dict]:
     return teams
 
 
+def load_teams(league_id: str, data_dir: Optional[Path] = None) -> list[dict]:
+    """Load teams for a league. Returns list of team objects."""
+    snap = _snapshot(league_id, "teams", data_dir)
+    if snap is not None:
+        return snap.derived(league_id, "teams", "teams", _flatten_teams)
+    path = _data_path(league_id, "teams", data_dir)
+    return _cache.derived(path, "teams", _flatten_teams) or []
+
+
+def load_teams_encoded(league_id: str, data_dir: Optional[Path] = None) -> Optional[EncodedJSON]:
+    """load_teams() as a response body (see load_league_encoded), encoded once per version."""
+    snap = _snapshot(league_id, "teams", data_dir)
+    if snap is not None:
+        return snap.derived(
+            league_id, "teams", "teams_encoded", lambda payload: EncodedJSON.from_obj(_flatten_teams(payload))
+        )
+    path = _data_path(league_id, "teams", data_dir)
+    return _cache.derived(path, "teams_encoded", lambda payload: EncodedJSON.from_obj(_flatten_teams(payload)))
+
+
 def load_standings(league_id: str, data_dir: Optional[Path] = None) -> Optional[dict]:
     """Load standings for a league."""
     payload = load_league_data(league_id, "standings", data_dir)
@@ -63,6 +212,12 @@ def load_scoreboard(league_id: str, data_dir: Optional[Path] = None) -> Optional
     return payload.get("data") if payload else None
 
 
+def load_scoreboard_for_date(league_id: str, date_str: str, data_dir: Optional[Path] = None) -> Optional[dict]:
+    """Load the stored scoreboard for a day (YYYYMMDD), as saved by harvests and the date API."""
+    payload = load_league_data(league_id, f"scoreboard_{date_str}", data_dir)
+    return payload.get("data") if payload else None
+
+
 def load_schedule(league_id: str, data_dir: Optional[Path] = None) -> Optional[dict]:
     """Load schedule for a league."""
     payload = load_league_data(league_id, "schedule", data_dir)
@@ -77,6 +232,52 @@ def load_game_summary(
     return payload.get("data") if payload else None
 
 
+def load_matchup(league_id: str, event_id: str, data_dir: Optional[Path] = None) -> Optional[dict]:
+    """Load the precomputed matchup comparison for an event (see matchups.py)."""
+    payload = load_league_data(league_id, f"matchup_{event_id}", data_dir)
+    return payload.get("data") if payload else None
+
+
+def _load_for_season(
+    league_id: str, data_type: str, season: int, data_dir: Optional[Path] = None
+) -> Optional[dict]:
+    payload = load_league_data(league_id, data_type, data_dir)
+    data = payload.get("data") if payload else None
+    return data if data and data.get("season") == season else None
+
+
+def load_team_roster(
+    league_id: str, team_id: str, season: int, data_dir: Optional[Path] = None
+) -> Optional[dict]:
+    """Load a harvested team detail ({"team": ...} with record and roster) for a season (see rosters.py)."""
+    return _load_for_season(league_id, f"roster_{team_id}", season, data_dir)
+
+
+def load_team_stats(
+    league_id: str, team_id: str, season: int, data_dir: Optional[Path] = None
+) -> Optional[dict]:
+    """Load a team's harvested season statistics."""
+    return _load_for_season(league_id, f"team_stats_{team_id}", season, data_dir)
+
+
+def load_athlete(
+    league_id: str, athlete_id: str, season: int, data_dir: Optional[Path] = None
+) -> Optional[dict]:
+    """Load a harvested athlete profile: {"info": ..., "statistics": ...} for a season."""
+    return _load_for_season(league_id, f"athlete_{athlete_id}", season, data_dir)
+
+
+def load_rankings(league_id: str, season: int, data_dir: Optional[Path] = None) -> Optional[dict]:
+    """Load a league's team stat rankings for a season (see rankings.py)."""
+    return _load_for_season(league_id, "rankings", season, data_dir)
+
+
+def load_records(league_id: str, data_type: str, data_dir: Optional[Path] = None) -> Optional[Any]:
+    """Load the typed stat records saved with a data type (see statnorm.py), e.g. "team_stats_25"."""
+    payload = _cache.get(get_data_dir(data_dir) / league_id / "records" / f"{data_type}.json")
+    return payload.get("data") if payload else None
+
+
 def load_summaries_today(league_id: str, data_dir: Optional[Path] = None) -> list[str]:
     """Load list of event IDs for today's harvested game summaries."""
     payload = load_league_data(league_id, "summaries_today", data_dir)
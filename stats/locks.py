@@ -0,0 +1,104 @@
+"""
+Cross-process file locks in the data directory.
+scheduler.lock elects the one process that runs the harvest scheduler;
+harvest.lock serializes harvest runs so two writers never overlap.
+Locks are held by an open file, so the OS releases them if the holder dies.
+gevent_worker() tells a gevent web worker apart, since it must leave harvesting
+to a separate process.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import DATA_DIR
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def gevent_worker() -> bool:
+    """True in a process whose threading is monkey-patched by gevent (gunicorn --worker-class gevent)."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+class FileLock:
+    """Exclusive lock on a file (flock on POSIX, msvcrt.locking on Windows)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = None
+
+    @property
+    def held(self) -> bool:
+        return self._file is not None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock. With blocking=False returns False at once if another holder has it."""
+        if self._file is not None:
+            return True
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        f = open(self.path, "a+b")
+        try:
+            # Poll a non-blocking lock rather than block in the kernel, so waiting stays
+            # cooperative under gevent workers (time.sleep yields to other greenlets)
+            while True:
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    else:
+                        f.seek(0)
+                        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    if not blocking:
+                        raise
+                    time.sleep(0.2)
+        except OSError:
+            f.close()
+            return False
+        # Holder's pid, for anyone looking at the data dir
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()).encode())
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self) -> None:
+        if self._file is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+
+def leader_lock(data_dir: Optional[Path] = None) -> FileLock:
+    """Lock held by the process that runs the harvest scheduler."""
+    return FileLock(Path(data_dir or DATA_DIR) / "scheduler.lock")
+
+
+def harvest_lock(data_dir: Optional[Path] = None) -> FileLock:
+    """Lock held for the duration of a harvest run."""
+    return FileLock(Path(data_dir or DATA_DIR) / "harvest.lock")
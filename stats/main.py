@@ -8,12 +8,28 @@ import logging
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Callable
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from config import DATA_DIR, LEAGUES
-from harvester.espn_harvester import ESPNHarvester
+from config import (
+    DATA_DIR,
+    LEAGUES,
+    MAX_SUMMARIES_PER_LEAGUE,
+    SEASON_MONTHS,
+    SNAPSHOT_ENABLED,
+    SNAPSHOT_TYPES,
+    SQLITE_ENABLED,
+)
+from gametime import get_season_year
+from harvester.espn_harvester import NOT_MODIFIED, ESPNHarvester
+from jsonio import read_json, write_json
+from locks import harvest_lock
+from matchups import harvest_matchups
+from rankings import harvest_rankings
+from rosters import TEAM_DATA_HARVESTERS
+from snapshot import publish_snapshot
 from storage import StatsStorage
 
 
@@ -26,76 +42,266 @@ def setup_logging(verbose: bool = False) -> None:
     )
 
 
+def in_season(league_id: str, date: datetime | None = None) -> bool:
+    """Whether the league plays games this month (regular season or postseason)."""
+    months = SEASON_MONTHS.get(league_id)
+    if not months:
+        return True
+    date = date or datetime.now()
+    start, end = months
+    if start <= end:
+        return start <= date.month <= end
+    return date.month >= start or date.month <= end
+
+
+def harvest_summaries(
+    harvester: ESPNHarvester,
+    storage: StatsStorage,
+    league_id: str,
+    date: datetime,
+    max_games: int = MAX_SUMMARIES_PER_LEAGUE,
+    scoreboard: dict | None = None,
+    incremental: bool = True,
+) -> int:
+    """
+    Harvest game summaries for a scoreboard and save them. Returns number of summaries written.
+    Incremental: games already final on disk are never refetched, and pre-game summaries
+    only when the event's status or score changed.
+    """
+    board = scoreboard
+    if board is None:
+        # A scoreboard fetched here is saved like a harvested one, so its validators match disk
+        board = harvester.harvest_scoreboard(league_id, date, remember_validators=True)
+        if board:
+            storage.save_json(league_id, f"scoreboard_{date.strftime('%Y%m%d')}", board)
+            storage.save_json(league_id, "scoreboard", board)
+    if not board:
+        return 0
+    event_ids = [str(e["id"]) for e in board.get("events", [])[:max_games] if e.get("id")]
+    stored = None
+    if incremental:
+        stored = {}
+        for event_id in event_ids:
+            payload = storage.load_json(league_id, f"summary_{event_id}")
+            if payload:
+                stored[event_id] = payload.get("data") or {}
+
+    summaries = harvester.harvest_game_summaries_from_scoreboard(
+        league_id, date, max_games=max_games, scoreboard=board, stored=stored
+    )
+    saved = 0
+    for event_id, summary in summaries:
+        saved += storage.save_json(league_id, f"summary_{event_id}", summary)
+
+    fetched = {event_id for event_id, _ in summaries}
+    available = [eid for eid in event_ids if eid in fetched or (stored and eid in stored)]
+    if available:
+        storage.save_json(league_id, "summaries_today", {"event_ids": available})
+    if stored is not None:
+        skipped = len(event_ids) - len(summaries)
+        logging.info("%s summaries: %d fetched, %d unchanged", league_id.upper(), len(summaries), skipped)
+    return saved
+
+
+def _matchup_inputs_changed(storage: StatsStorage, league_id: str) -> bool:
+    written = {data_type for lg, data_type in storage.written if lg == league_id}
+    return bool(written & {"scoreboard", "schedule", "rankings"}) or any(
+        data_type.startswith(("summary_", "team_stats_")) for data_type in written
+    )
+
+
 def run_harvest(
     leagues: list[str] | None = None,
     types: list[str] | None = None,
     output: Path | None = None,
-    quiet: bool = False,
+    sqlite: bool | None = None,
+    progress: Callable[[str, str, int], None] | None = None,
+    harvester: ESPNHarvester | None = None,
+    skip_since: datetime | None = None,
 ) -> int:
-    """Run harvest programmatically. Returns number of files saved."""
-    from storage import StatsStorage
-
+    """
+    Run harvest programmatically. Returns number of files saved.
+    With sqlite (default: SQLITE_ENABLED), the run is also written to stats.db in one transaction.
+    progress(league_id, data_type, files_saved) is called as each league's data type finishes.
+    Pass a long-lived harvester (the scheduler does) to reuse its session, cache and validators
+    across runs; otherwise each run builds its own.
+    Runs against the same data dir are serialized across processes (data/harvest.lock).
+    With skip_since, (league, type) pairs that another run finished after that time (typically
+    while this one waited for the lock) are skipped, and reported to progress as 0 saved.
+    """
     leagues = leagues or list(LEAGUES.keys())
     types = types or ["teams", "standings", "scoreboard", "schedule"]
     output = output or DATA_DIR
-    if quiet:
-        logging.getLogger().setLevel(logging.WARNING)
+    progress = progress or (lambda league_id, data_type, saved: None)
+
+    with harvest_lock(output):
+        if skip_since is not None:
+            leagues, types = _pending(output, leagues, types, skip_since, progress)
+            if not leagues:
+                logging.info("Harvest skipped: another run finished it after %s", skip_since.isoformat())
+                return 0
+        saved = _run_harvest(
+            leagues, types, output, SQLITE_ENABLED if sqlite is None else sqlite, progress,
+            harvester or ESPNHarvester(data_dir=output),
+        )
+        _record_finished(output, leagues, types)
+        return saved
+
+
+def _pending(
+    output: Path,
+    leagues: list[str],
+    types: list[str],
+    since: datetime,
+    progress: Callable[[str, str, int], None],
+) -> tuple[list[str], list[str]]:
+    """Leagues and types that still have a (league, type) pair not finished since `since`."""
+    finished = _load_finished(output)
+    done = {
+        (league_id, data_type)
+        for league_id in leagues
+        for data_type in types
+        if finished.get(f"{league_id}/{data_type}", "") >= since.isoformat()
+    }
+    for league_id, data_type in sorted(done):
+        progress(league_id, data_type, 0)
+    pending = [(lg, t) for lg in leagues for t in types if (lg, t) not in done]
+    return (
+        [lg for lg in leagues if any(p[0] == lg for p in pending)],
+        [t for t in types if any(p[1] == t for p in pending)],
+    )
+
+
+def _load_finished(output: Path) -> dict[str, str]:
+    """data/harvests.json: "league/type" -> when a run that harvested it last finished."""
+    try:
+        return read_json(output / "harvests.json")
+    except (OSError, ValueError):
+        return {}
 
-    harvester = ESPNHarvester(data_dir=output)
-    storage = StatsStorage(data_dir=output)
+
+def _record_finished(output: Path, leagues: list[str], types: list[str]) -> None:
+    finished = _load_finished(output)
+    now = datetime.now().isoformat()
+    finished.update({f"{league_id}/{data_type}": now for league_id in leagues for data_type in types})
+    try:
+        write_json(output / "harvests.json", finished)
+    except OSError as e:
+        logging.warning("Could not record finished harvest: %s", e)
+
+
+def _run_harvest(
+    leagues: list[str],
+    types: list[str],
+    output: Path,
+    sqlite: bool,
+    progress: Callable[[str, str, int], None],
+    harvester: ESPNHarvester,
+) -> int:
+    storage = StatsStorage(data_dir=output, sqlite=sqlite)
     date = datetime.now()
     total_saved = 0
 
-    def get_season_year(league_id: str) -> int:
-        """ESPN uses season start year. NBA/NHL start Oct, NFL Sep, MLB Apr."""
-        y, m = date.year, date.month
-        if league_id in ("nba", "nhl"):
-            return y if m >= 10 else y - 1  # Season starts Oct
-        if league_id == "nfl":
-            return y if m >= 9 else y - 1  # Season starts Sep
-        if league_id == "mlb":
-            return y if m >= 4 else y - 1  # Season starts Apr
-        return y
-
+    # Independent requests for all leagues overlap; the harvester's rate limiter keeps them polite.
+    # Types we already have on disk are fetched conditionally (304 -> nothing to decode or save).
+    date_str = date.strftime("%Y%m%d")
+    calls = {}
     for league_id in leagues:
+        season = get_season_year(league_id, date)
         if "teams" in types:
-            data = harvester.harvest_teams(league_id)
-            if data:
-                storage.save_json(league_id, "teams", data)
-                total_saved += 1
-
+            cond = storage.exists(league_id, "teams")
+            calls[(league_id, "teams")] = (
+                lambda lg=league_id, c=cond: harvester.harvest_teams(
+                    lg, conditional=c, remember_validators=True
+                )
+            )
         if "standings" in types:
-            season = get_season_year(league_id)
-            data = harvester.harvest_standings(league_id, season)
-            if data:
-                storage.save_json(league_id, "standings", data)
-                total_saved += 1
-
+            cond = storage.exists(league_id, "standings")
+            calls[(league_id, "standings")] = (
+                lambda lg=league_id, s=season, c=cond: harvester.harvest_standings(
+                    lg, s, conditional=c, remember_validators=True
+                )
+            )
         if "schedule" in types:
-            season = get_season_year(league_id)
-            data = harvester.harvest_schedule(league_id, season)
-            if data:
-                storage.save_json(league_id, "schedule", data)
-                total_saved += 1
+            cond = storage.exists(league_id, "schedule")
+            calls[(league_id, "schedule")] = (
+                lambda lg=league_id, s=season, c=cond: harvester.harvest_schedule(
+                    lg, s, conditional=c, remember_validators=True
+                )
+            )
+        if "scoreboard" in types:
+            cond = storage.exists(league_id, "scoreboard") and storage.exists(
+                league_id, f"scoreboard_{date_str}"
+            )
+            calls[(league_id, "scoreboard")] = (
+                lambda lg=league_id, c=cond: harvester.harvest_scoreboard(
+                    lg, date, conditional=c, remember_validators=True
+                )
+            )
+
+    unchanged = 0
+    for (league_id, data_type), data in harvester.gather(calls).items():
+        saved = 0
+        if data is NOT_MODIFIED:
+            unchanged += 1
+        elif data:
+            if data_type == "scoreboard":
+                storage.save_json(league_id, f"scoreboard_{date_str}", data)
+            saved = int(storage.save_json(league_id, data_type, data))
+            total_saved += saved
+        progress(league_id, data_type, saved)
+    if unchanged:
+        logging.info("%d data types unchanged since last harvest (304)", unchanged)
 
-    if "scoreboard" in types:
+    if "game_summary" in types:
         for league_id in leagues:
-            data = harvester.harvest_scoreboard(league_id, date)
-            if data:
-                date_str = date.strftime("%Y%m%d")
-                storage.save_json(league_id, f"scoreboard_{date_str}", data)
-                storage.save_json(league_id, "scoreboard", data)
-                total_saved += 1
+            board = None
+            if "scoreboard" in types:
+                payload = storage.load_json(league_id, "scoreboard")
+                board = payload.get("data") if payload else None
+            n = harvest_summaries(harvester, storage, league_id, date, scoreboard=board)
+            total_saved += n
+            progress(league_id, "game_summary", n)
+
+    # Rosters, team statistics and athlete profiles for the team and player pages
+    for data_type, harvest in TEAM_DATA_HARVESTERS.items():
+        if data_type in types:
+            for league_id in leagues:
+                n = harvest(harvester, storage, league_id, get_season_year(league_id, date))
+                total_saved += n
+                progress(league_id, data_type, n)
+
+    # League-wide stat rankings follow the team statistics they are computed from
+    if {"team_stats", "rankings"} & set(types):
+        for league_id in leagues:
+            n = harvest_rankings(harvester, storage, league_id, get_season_year(league_id, date))
+            total_saved += n
+            if "rankings" in types:
+                progress(league_id, "rankings", n)
+
+    # Matchup documents are rebuilt on their own cadence ("matchups"), and in between only when
+    # a run wrote events, summaries or team statistics they are built from
+    for league_id in leagues:
+        if "matchups" in types or _matchup_inputs_changed(storage, league_id):
+            n = harvest_matchups(harvester, storage, league_id, date, get_season_year(league_id, date))
+            total_saved += n
+            if "matchups" in types:
+                progress(league_id, "matchups", n)
 
     if "news" in types:
         from harvester.news_fetcher import fetch_all_news
 
         all_news = fetch_all_news(limit_per_league=15, rewrite=True)
-        for league_id, items in all_news.items():
-            if items:
-                storage.save_json(league_id, "news", items)
-                total_saved += 1
-
+        for league_id in leagues:
+            items = all_news.get(league_id)
+            saved = int(storage.save_json(league_id, "news", items)) if items else 0
+            total_saved += saved
+            progress(league_id, "news", saved)
+
+    storage.flush_sqlite()
+    # The snapshot only holds SNAPSHOT_TYPES; other writes (summaries, rosters, ...) don't change it
+    if SNAPSHOT_ENABLED and any(data_type in SNAPSHOT_TYPES for _, data_type in storage.written):
+        publish_snapshot(output)
     return total_saved
 
 
@@ -113,7 +319,10 @@ def main() -> None:
     parser.add_argument(
         "--types",
         nargs="+",
-        choices=["teams", "standings", "scoreboard", "schedule", "game_summary", "news"],
+        choices=[
+            "teams", "standings", "scoreboard", "schedule", "game_summary",
+            "rosters", "team_stats", "athletes", "rankings", "matchups", "news",
+        ],
         default=["teams", "standings", "scoreboard"],
         help="Data types to harvest (default: teams, standings, scoreboard)",
     )
@@ -158,11 +367,32 @@ def main() -> None:
         default=10,
         help="Max game summaries to harvest per league when using game_summary (default: 10)",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch summaries for live games or games whose status/score changed (finals are kept)",
+    )
     parser.add_argument(
         "--no-rewrite",
         action="store_true",
         help="Skip LLM rewrite when harvesting news (store raw RSS only)",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Roll archived snapshots older than today into indexed daily packs, apply retention, and exit",
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=None,
+        help="With --compact: delete packs older than N days (default: ARCHIVE_RETENTION_DAYS, 0 = keep all)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Run the adaptive harvest scheduler for --leagues until interrupted (instead of serve.py's thread)",
+    )
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -172,8 +402,24 @@ def main() -> None:
     args = parser.parse_args()
     setup_logging(args.verbose)
 
+    if args.daemon:
+        from scheduler import run_scheduler
+
+        print(f"Harvest scheduler for {', '.join(args.leagues)} -> {args.output} (Ctrl+C to stop)")
+        try:
+            run_scheduler(leagues=args.leagues, data_dir=args.output)
+        except KeyboardInterrupt:
+            pass
+        return
+
     harvester = ESPNHarvester(data_dir=args.output)
-    storage = StatsStorage(data_dir=args.output)
+    storage = StatsStorage(data_dir=args.output, sqlite=args.sqlite)
+
+    if args.compact:
+        with harvest_lock(args.output):
+            n = storage.compact(retention_days=args.retention_days)
+        print(f"Compaction complete. {n} snapshots packed in {args.output}")
+        return
 
     date = datetime.now()
     if args.date:
@@ -183,68 +429,59 @@ def main() -> None:
             logging.error("Invalid date format. Use YYYYMMDD")
             sys.exit(1)
 
-    season = args.season or date.year
+    # ESPN's season for each league on that date (season start year), unless --season is given
+    seasons = {league_id: args.season or get_season_year(league_id, date) for league_id in args.leagues}
     total_saved = 0
 
+    # Held until exit, so a scheduled run never writes alongside this one
+    lock = harvest_lock(args.output)
+    lock.acquire()
+
+    # Teams, standings, schedule - fetched concurrently across leagues
+    base_calls = {}
     for league_id in args.leagues:
-        # Teams
         if "teams" in args.types:
-            data = harvester.harvest_teams(league_id)
-            if data:
-                storage.save_json(league_id, "teams", data)
-                if args.sqlite:
-                    storage.save_to_sqlite(league_id, "teams", data)
-                total_saved += 1
-                print(f"  Saved: {league_id}/teams.json")
-
-        # Standings
+            base_calls[(league_id, "teams")] = lambda lg=league_id: harvester.harvest_teams(lg)
         if "standings" in args.types:
-            data = harvester.harvest_standings(league_id, season)
-            if data:
-                storage.save_json(league_id, "standings", data)
-                if args.sqlite:
-                    storage.save_to_sqlite(league_id, "standings", data)
-                total_saved += 1
-                print(f"  Saved: {league_id}/standings.json")
-
-        # Schedule
+            base_calls[(league_id, "standings")] = (
+                lambda lg=league_id: harvester.harvest_standings(lg, seasons[lg])
+            )
         if "schedule" in args.types:
-            data = harvester.harvest_schedule(league_id, season)
-            if data:
-                storage.save_json(league_id, "schedule", data)
-                if args.sqlite:
-                    storage.save_to_sqlite(league_id, "schedule", data)
+            base_calls[(league_id, "schedule")] = (
+                lambda lg=league_id: harvester.harvest_schedule(lg, seasons[lg])
+            )
+
+    for (league_id, data_type), data in harvester.gather(base_calls).items():
+        if data:
+            if storage.save_json(league_id, data_type, data):
                 total_saved += 1
-                print(f"  Saved: {league_id}/schedule.json")
+                print(f"  Saved: {league_id}/{data_type}.json")
+            else:
+                print(f"  Unchanged: {league_id}/{data_type}.json")
 
     # Scoreboard - single date or date range
     if "scoreboard" in args.types:
         if args.days <= 0:
-            for league_id in args.leagues:
-                data = harvester.harvest_scoreboard(league_id, date)
+            boards = harvester.gather(
+                {lg: (lambda lg=lg: harvester.harvest_scoreboard(lg, date)) for lg in args.leagues}
+            )
+            for league_id, data in boards.items():
                 if data:
                     date_str = date.strftime("%Y%m%d")
                     storage.save_json(league_id, f"scoreboard_{date_str}", data)
-                    storage.save_json(league_id, "scoreboard", data)  # current
-                    if args.sqlite:
-                        storage.save_to_sqlite(league_id, f"scoreboard_{date_str}", data)
-                    total_saved += 1
+                    total_saved += storage.save_json(league_id, "scoreboard", data)  # current
                     print(f"  Saved: {league_id}/scoreboard.json ({date_str})")
         else:
             end_date = date + timedelta(days=args.days)
             for league_id in args.leagues:
-                results = harvester.harvest_date_range(league_id, date, end_date)
-                for i, data in enumerate(results):
-                    d = date + timedelta(days=i)
-                    date_str = d.strftime("%Y%m%d")
-                    storage.save_json(league_id, f"scoreboard_{date_str}", data)
-                    if args.sqlite:
-                        storage.save_to_sqlite(league_id, f"scoreboard_{date_str}", data)
-                    total_saved += 1
+                # Multi-day requests, split back into one file per day
+                days = harvester.harvest_scoreboard_range(league_id, date, end_date)
+                for date_str, data in sorted(days.items()):
+                    total_saved += storage.save_json(league_id, f"scoreboard_{date_str}", data)
                 # Latest as current scoreboard
-                if results:
-                    storage.save_json(league_id, "scoreboard", results[-1])
-                print(f"  Saved: {league_id}/scoreboard ({len(results)} days)")
+                if days:
+                    storage.save_json(league_id, "scoreboard", days[max(days)])
+                print(f"  Saved: {league_id}/scoreboard ({len(days)} days)")
 
     # Game summaries (box scores, play-by-play) - per game or from today's scoreboard
     if "game_summary" in args.types:
@@ -256,21 +493,40 @@ def main() -> None:
                     total_saved += 1
                     print(f"  Saved: {league_id}/summary_{args.event}.json")
             else:
-                summaries = harvester.harvest_game_summaries_from_scoreboard(
-                    league_id, date, max_games=args.max_summaries
+                n = harvest_summaries(
+                    harvester,
+                    storage,
+                    league_id,
+                    date,
+                    max_games=args.max_summaries,
+                    incremental=args.incremental,
                 )
-                event_ids = []
-                for event_id, summary in summaries:
-                    storage.save_json(league_id, f"summary_{event_id}", summary)
-                    total_saved += 1
-                    event_ids.append(event_id)
-                if event_ids:
-                    storage.save_json(
-                        league_id,
-                        "summaries_today",
-                        {"event_ids": event_ids},
-                    )
-                    print(f"  Saved: {league_id} ({len(summaries)} game summaries)")
+                total_saved += n
+                if n:
+                    print(f"  Saved: {league_id} ({n} game summaries)")
+
+    # Rosters, team statistics and athlete profiles (teams must have been harvested)
+    for data_type, harvest in TEAM_DATA_HARVESTERS.items():
+        if data_type in args.types:
+            for league_id in args.leagues:
+                n = harvest(harvester, storage, league_id, seasons[league_id])
+                total_saved += n
+                print(f"  Saved: {league_id} ({n} {data_type})")
+
+    # League-wide team stat rankings (ranks, percentiles, z-scores)
+    if {"team_stats", "rankings"} & set(args.types):
+        for league_id in args.leagues:
+            n = harvest_rankings(harvester, storage, league_id, seasons[league_id])
+            total_saved += n
+            if n:
+                print(f"  Saved: {league_id}/rankings.json")
+
+    # Matchup comparisons for today's scoreboard and the coming week's schedule
+    if "matchups" in args.types:
+        for league_id in args.leagues:
+            n = harvest_matchups(harvester, storage, league_id, date, seasons[league_id])
+            total_saved += n
+            print(f"  Saved: {league_id} ({n} matchups)")
 
     # News (ESPN RSS + optional LLM rewrite)
     if "news" in args.types:
@@ -288,6 +544,15 @@ def main() -> None:
                 total_saved += 1
                 print(f"  Saved: {league_id}/news.json ({len(items)} items, rewrite={rewrite})")
 
+    if args.sqlite:
+        rows = storage.flush_sqlite()
+        print(f"  Saved: {rows} rows to {args.output / 'stats.db'}")
+
+    if SNAPSHOT_ENABLED and any(data_type in SNAPSHOT_TYPES for _, data_type in storage.written):
+        path = publish_snapshot(args.output)
+        if path:
+            print(f"  Published: {path.relative_to(args.output)}")
+
     print(f"\nHarvest complete. {total_saved} files saved to {args.output}")
     print("Data is ready for website consumption.")
 
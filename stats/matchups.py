@@ -0,0 +1,254 @@
+"""
+Matchup comparison documents.
+build_matchup() turns a game summary (or a scoreboard event) and both teams' season
+statistics into the season and game comparison tables shown on matchup pages.
+harvest_matchups() builds one for every event on the current scoreboard and the next
+days of the schedule and stores it as data/{league}/matchup_{event_id}.json, so the
+matchup routes read a file instead of calling ESPN.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from archive import content_hash
+from config import MATCHUP_SCHEDULE_DAYS
+from gametime import event_day, get_season_year
+from harvester.espn_harvester import ESPNHarvester, event_status
+from jsonio import dumps
+from loader import load_rankings, load_records
+from rankings import ordinal, team_ranks
+from rosters import refresh_team_stats
+from statnorm import LOWER, competitor_records, team_stat_records
+from storage import StatsStorage
+
+logger = logging.getLogger(__name__)
+
+# Box score stat name -> label for the in-game comparison bars
+GAME_STATS = {
+    "fieldGoalsMade-fieldGoalsAttempted": "FG",
+    "fieldGoalPct": "FG %",
+    "threePointFieldGoalsMade-threePointFieldGoalsAttempted": "3PT",
+    "threePointFieldGoalPct": "3PT %",
+    "freeThrowsMade-freeThrowsAttempted": "FT",
+    "freeThrowPct": "FT %",
+    "totalRebounds": "Rebounds",
+    "offensiveRebounds": "Off. Rebounds",
+    "assists": "Assists",
+    "steals": "Steals",
+    "blocks": "Blocks",
+    "turnovers": "Turnovers",
+    "fouls": "Fouls",
+}
+
+
+def _bar_split(na: float, nb: float) -> tuple[float, float]:
+    """Percent of a two-sided bar for each value (negative values shifted up to zero)."""
+    low = min(na, nb, 0)
+    na, nb = na - low, nb - low
+    total = na + nb
+    return ((na / total * 100) if total > 0 else 50), ((nb / total * 100) if total > 0 else 50)
+
+
+def matchup_competitors(summary: Optional[dict] = None, event: Optional[dict] = None) -> list[dict]:
+    """Competitor entries: box score teams when the game has stats, else header/event competitors."""
+    if summary:
+        comps = (summary.get("boxscore") or {}).get("teams", [])
+        if comps:
+            return comps
+        header = summary.get("header", {})
+        return (header.get("competitions") or [{}])[0].get("competitors", [])
+    if event:
+        return (event.get("competitions") or [{}])[0].get("competitors", [])
+    return []
+
+
+def _competitor_team(t: dict) -> dict:
+    return t.get("team", t) if isinstance(t.get("team"), dict) else (t if isinstance(t, dict) else {})
+
+
+def competitor_team_ids(competitors: list[dict]) -> list[str]:
+    ids = []
+    for t in competitors:
+        team_id = _competitor_team(t).get("id") or t.get("id")
+        if team_id:
+            ids.append(str(team_id))
+    return ids
+
+
+def _team_side(t: dict, stats: Optional[dict]) -> dict:
+    res = (stats or {}).get("results", {})
+    return {
+        "team": _competitor_team(t),
+        "stat_categories": (res.get("stats", {}).get("categories", [])) or [],
+        "standing_summary": res.get("team", {}).get("standingSummary", "") or "",
+    }
+
+
+def _league_rank(record: dict, ranks: dict[str, dict]) -> str:
+    """League rank from our rankings (rankings.py), else ESPN's rankDisplayValue."""
+    ranked = ranks.get(record["name"])
+    return ordinal(ranked["rank"]) if ranked else record.get("rank_display", "")
+
+
+def compare_season_stats(
+    records_a: dict[str, dict],
+    records_b: dict[str, dict],
+    ranks_a: Optional[dict[str, dict]] = None,
+    ranks_b: Optional[dict[str, dict]] = None,
+) -> list[dict]:
+    """
+    Season stats both teams have (statnorm.team_stat_records), with bar percentages, which
+    side leads and each team's league rank and percentile (ranks_*: rankings.team_ranks()).
+    """
+    ranks_a, ranks_b = ranks_a or {}, ranks_b or {}
+    comparison = []
+    for name in sorted(records_a.keys() & records_b.keys()):
+        ra, rb = records_a[name], records_b[name]
+        na_raw, nb_raw = ra["value"] or 0, rb["value"] or 0
+        lower_better = ra["better"] == LOWER
+        na, nb = na_raw, nb_raw
+        if lower_better and (na_raw > 0 or nb_raw > 0):
+            m = max(na_raw, nb_raw)
+            na, nb = m - na_raw, m - nb_raw
+        pct_a, pct_b = _bar_split(na, nb)
+        if lower_better:
+            rank_a = 1 if na_raw < nb_raw else (2 if na_raw > nb_raw else 1)
+            rank_b = 1 if nb_raw < na_raw else (2 if nb_raw > na_raw else 1)
+        else:
+            rank_a = 1 if na_raw > nb_raw else (2 if na_raw < nb_raw else 1)
+            rank_b = 1 if nb_raw > na_raw else (2 if nb_raw < na_raw else 1)
+        comparison.append({
+            "label": ra["label"], "a": ra["display"], "b": rb["display"],
+            "pct_a": round(pct_a, 1), "pct_b": round(pct_b, 1), "rank_a": rank_a, "rank_b": rank_b,
+            "leagueRank_a": _league_rank(ra, ranks_a), "leagueRank_b": _league_rank(rb, ranks_b),
+            "percentile_a": (ranks_a.get(name) or {}).get("percentile"),
+            "percentile_b": (ranks_b.get(name) or {}).get("percentile"),
+        })
+    return comparison
+
+
+def compare_game_stats(records: list[dict[str, dict]]) -> list[dict]:
+    """Head-to-head box score stats (statnorm.competitor_records) for the first two teams, with bar percentages."""
+    records = (records + [{}, {}])[:2]
+    game_comparison = []
+    for stat_name, label in GAME_STATS.items():
+        ra, rb = records[0].get(stat_name), records[1].get(stat_name)
+        va, vb = (ra or {}).get("display", ""), (rb or {}).get("display", "")
+        if not va and not vb:
+            continue
+        pct_a, pct_b = _bar_split((ra or {}).get("value") or 0, (rb or {}).get("value") or 0)
+        game_comparison.append({"label": label, "a": va, "b": vb, "pct_a": pct_a, "pct_b": pct_b})
+    return game_comparison
+
+
+def build_matchup(
+    league_id: str,
+    event_id: str,
+    season: int,
+    competitors: list[dict],
+    team_stats: dict[str, Optional[dict]],
+    game_info: Optional[dict] = None,
+    team_records: Optional[dict[str, Optional[dict]]] = None,
+    rankings: Optional[dict] = None,
+    game_records: Optional[dict[str, dict]] = None,
+) -> dict:
+    """
+    Matchup document: both teams (with season stat categories and standing), the season
+    comparison table and the in-game comparison. team_stats maps team id -> statistics response;
+    team_records maps team id -> its stored typed records, normalized here for teams without them.
+    rankings is the league's stored rankings document, for league ranks and percentiles.
+    game_records maps team id -> box score records (summary_team_records of the stored summary
+    records); competitors without them are normalized here.
+    """
+    team_records = team_records or {}
+    game_records = game_records or {}
+    ids = [str(_competitor_team(t).get("id") or t.get("id")) for t in competitors]
+    sides = [_team_side(t, team_stats.get(team_id)) for t, team_id in zip(competitors, ids)]
+    records = [team_records.get(team_id) or team_stat_records(team_stats.get(team_id)) for team_id in ids]
+    ranks = [team_ranks(rankings, team_id) for team_id in ids]
+    while len(sides) < 2:
+        sides.append({"team": {}, "stat_categories": [], "standing_summary": ""})
+        records.append({})
+        ranks.append({})
+    team_a, team_b = sides[0], sides[1]
+    return {
+        "league_id": league_id,
+        "event_id": event_id,
+        "season": season,
+        "team_a": team_a,
+        "team_b": team_b,
+        "comparison": compare_season_stats(records[0], records[1], ranks[0], ranks[1]),
+        "game_comparison": compare_game_stats([
+            game_records.get(team_id) or competitor_records(t) for t, team_id in zip(competitors, ids)
+        ]),
+        "game_info": game_info or {},
+    }
+
+
+def summary_team_records(records: Optional[dict]) -> dict[str, dict]:
+    """Team id -> stat name -> record, from a game summary's stored box score records."""
+    return {t["team_id"]: t["stats"] for t in (records or {}).get("teams", []) if t.get("team_id")}
+
+
+def harvest_matchups(
+    harvester: ESPNHarvester,
+    storage: StatsStorage,
+    league_id: str,
+    date: datetime,
+    season: Optional[int] = None,
+) -> int:
+    """
+    Build and save matchup_{event_id} for every event on the stored scoreboard and every
+    scheduled event from yesterday through MATCHUP_SCHEDULE_DAYS ahead. Team statistics are
+    fetched concurrently, once per team, and reused while younger than TEAM_STATS_MAX_AGE.
+    A document is rewritten only when its inputs changed. Returns number of matchups saved.
+    """
+    season = season or get_season_year(league_id, date)
+    first = (date - timedelta(days=1)).strftime("%Y%m%d")
+    last = (date + timedelta(days=MATCHUP_SCHEDULE_DAYS)).strftime("%Y%m%d")
+    events: dict[str, dict] = {}
+    for data_type in ("scoreboard", "schedule"):
+        payload = storage.load_json(league_id, data_type)
+        for event in ((payload or {}).get("data") or {}).get("events", []):
+            if not event.get("id"):
+                continue
+            if data_type == "scoreboard" or first <= event_day(event) <= last:
+                events.setdefault(str(event["id"]), event)
+    if not events:
+        return 0
+
+    team_ids = sorted({tid for e in events.values() for tid in competitor_team_ids(matchup_competitors(event=e))})
+    refresh_team_stats(harvester, storage, league_id, team_ids, season)
+    stats_payloads = {team_id: storage.load_json(league_id, f"team_stats_{team_id}") for team_id in team_ids}
+
+    rankings = load_rankings(league_id, season, storage.data_dir)
+    saved = 0
+    for event_id, event in events.items():
+        summary_payload = storage.load_json(league_id, f"summary_{event_id}")
+        summary = summary_payload.get("data") if summary_payload else None
+        competitors = matchup_competitors(summary, event)
+        ids = competitor_team_ids(competitors)
+        fingerprint = content_hash(dumps([
+            season,
+            summary_payload["harvested_at"] if summary_payload else event_status(event),
+            [(stats_payloads.get(t) or {}).get("harvested_at") for t in ids],
+            (rankings or {}).get("fingerprint"),
+        ]))
+        stored = storage.load_json(league_id, f"matchup_{event_id}")
+        if stored and (stored.get("data") or {}).get("fingerprint") == fingerprint:
+            continue
+        doc = build_matchup(
+            league_id, event_id, season, competitors,
+            {t: (stats_payloads.get(t) or {}).get("data") for t in ids},
+            (summary or {}).get("gameInfo"),
+            {t: load_records(league_id, f"team_stats_{t}", storage.data_dir) for t in ids},
+            rankings,
+            summary_team_records(load_records(league_id, f"summary_{event_id}", storage.data_dir)),
+        )
+        doc["fingerprint"] = fingerprint
+        storage.save_json(league_id, f"matchup_{event_id}", doc)
+        saved += 1
+    if saved:
+        logger.info("Built %d matchups for %s", saved, league_id)
+    return saved
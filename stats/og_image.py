@@ -0,0 +1,279 @@
+"""
+Poll preview images for /api/og-image (Facebook/social link previews).
+Images are keyed by a hash of the normalized question and options, so every share
+of the same poll maps to one PNG: kept in a memory LRU, on disk under
+data/og_images/, and sent with that key as its ETag. Misses render in a small
+process pool (fonts loaded once per worker) so a burst of shares doesn't tie up
+the web worker's CPU; a gevent worker renders them on gevent's native thread pool,
+so its event loop keeps serving other requests meanwhile.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+from config import (
+    DATA_DIR,
+    OG_IMAGE_DISK_MAX_AGE,
+    OG_IMAGE_DISK_MAX_FILES,
+    OG_IMAGE_MEMORY_ENTRIES,
+    OG_IMAGE_WORKERS,
+)
+from harvester.transport import SingleFlight
+from jsonio import atomic_write, dumps
+from locks import gevent_worker
+
+logger = logging.getLogger(__name__)
+
+# Bump when the drawing changes so cached images (and client ETags) are replaced
+RENDER_VERSION = 1
+
+WIDTH, HEIGHT = 1200, 630
+MAX_QUESTION_LINES = 3
+QUESTION_LINE_CHARS = 45
+MAX_OPTIONS = 6
+OPTION_CHARS = 50
+FONT_BOLD = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+FONT_REGULAR = "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+
+_fonts = None
+
+
+def _load_fonts():
+    """(large, medium) fonts, read from disk once per process."""
+    global _fonts
+    if _fonts is None:
+        from PIL import ImageFont
+
+        try:
+            _fonts = (ImageFont.truetype(FONT_BOLD, 44), ImageFont.truetype(FONT_REGULAR, 26))
+        except OSError:
+            _fonts = (ImageFont.load_default(),) * 2
+    return _fonts
+
+
+def wrap_text(text: str, max_chars: int) -> list[str]:
+    words = text.split()
+    lines, current = [], ""
+    for w in words:
+        if len(current) + len(w) + 1 <= max_chars:
+            current = f"{current} {w}".strip() if current else w
+        else:
+            if current:
+                lines.append(current)
+            current = w
+    if current:
+        lines.append(current)
+    return lines
+
+
+def normalize(question: str, options: list[str]) -> tuple[str, list[str]]:
+    """
+    Collapse whitespace and drop what the image can't show (question lines past
+    MAX_QUESTION_LINES, option text past OPTION_CHARS, options past MAX_OPTIONS),
+    so equivalent polls share a key and oversized input is cut before it is hashed.
+    """
+    # Raw input is cut first: nothing beyond twice the drawable length can reach the image
+    question = (question or "")[: 2 * MAX_QUESTION_LINES * QUESTION_LINE_CHARS]
+    question = " ".join(wrap_text(question, QUESTION_LINE_CHARS)[:MAX_QUESTION_LINES]) or "Bragging Rights Poll"
+    kept = []
+    for o in options:
+        o = " ".join(o[: 2 * OPTION_CHARS].split())[:OPTION_CHARS]
+        if o:
+            kept.append(o)
+            if len(kept) == MAX_OPTIONS:
+                break
+    return question, kept
+
+
+def image_key(question: str, options: list[str]) -> str:
+    """Content key (and ETag) of the image for a normalized question and options."""
+    return hashlib.sha256(dumps([RENDER_VERSION, question, options])).hexdigest()[:24]
+
+
+def render_png(question: str, options: list[str]) -> bytes:
+    """Draw the preview. Module-level so the process pool can call it."""
+    from PIL import Image, ImageDraw
+
+    font_lg, font_md = _load_fonts()
+    img = Image.new("RGB", (WIDTH, HEIGHT), color=(16, 22, 36))
+    draw = ImageDraw.Draw(img)
+
+    y = 50
+    draw.text((WIDTH // 2, y), "BRAGGING RIGHTS", fill=(63, 167, 255), font=font_md, anchor="mt")
+    y += 55
+    for line in wrap_text(question, QUESTION_LINE_CHARS)[:MAX_QUESTION_LINES]:
+        draw.text((WIDTH // 2, y), line, fill=(230, 233, 240), font=font_lg, anchor="mt")
+        y += 50
+    y += 25
+    for i, opt in enumerate(options):
+        draw.rectangle([(100, y), (WIDTH - 100, y + 45)], fill=(34, 44, 74))
+        draw.text((130, y + 22), f"{i + 1}. {opt}", fill=(230, 233, 240), font=font_md)
+        y += 55
+    y += 20
+    draw.text((WIDTH // 2, y), "Vote at Bragging Rights", fill=(63, 167, 255), font=font_md, anchor="mt")
+
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class OGImageRenderer:
+    """key -> PNG bytes: memory LRU over data/og_images/, rendering misses in a process pool."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        max_entries: int = OG_IMAGE_MEMORY_ENTRIES,
+        workers: int = OG_IMAGE_WORKERS,
+        max_files: int = OG_IMAGE_DISK_MAX_FILES,
+    ):
+        self.cache_dir = Path(cache_dir or DATA_DIR / "og_images")
+        self.max_entries = max_entries
+        self.workers = workers
+        self.max_files = max_files
+        self.hits = 0
+        self.disk_hits = 0
+        self.renders = 0
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = SingleFlight()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.png"
+
+    def _remember(self, key: str, png: bytes) -> None:
+        with self._lock:
+            self._memory[key] = png
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        # A process pool's feeder threads and pipes don't mix with gevent's monkey-patching
+        if self.workers <= 0 or gevent_worker():
+            return None
+        with self._lock:
+            if self._pool is None:
+                # spawn, not fork: the web process has the scheduler and transport threads running
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_fonts,
+                )
+            return self._pool
+
+    def _render(self, question: str, options: list[str]) -> bytes:
+        if gevent_worker():
+            # A real OS thread: the greenlet waits cooperatively instead of blocking the loop
+            from gevent import get_hub
+
+            return get_hub().threadpool.apply(render_png, (question, options))
+        pool = self._executor()
+        if pool is None:
+            return render_png(question, options)
+        try:
+            return pool.submit(render_png, question, options).result()
+        except BrokenProcessPool:
+            logger.warning("OG image pool died; rendering in-process")
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            return render_png(question, options)
+
+    def get(self, key: str, question: str, options: list[str]) -> bytes:
+        """PNG for key (from image_key of the same normalized question and options)."""
+        with self._lock:
+            png = self._memory.get(key)
+            if png is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return png
+        return self._flights.do(key, lambda: self._load_or_render(key, question, options))
+
+    def _load_or_render(self, key: str, question: str, options: list[str]) -> bytes:
+        path = self._path(key)
+        try:
+            png = path.read_bytes()
+            with self._lock:
+                self.disk_hits += 1
+            try:
+                os.utime(path)  # mtime is the last use, for prune()
+            except OSError:
+                pass
+        except FileNotFoundError:
+            png = self._render(question, options)
+            with self._lock:
+                self.renders += 1
+                # Keep the disk tier near max_files between the scheduler's daily prune
+                check = self.max_files > 0 and self.renders % max(1, self.max_files // 10) == 0
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write(path, png)
+            except OSError as e:
+                logger.warning("Could not write OG image %s: %s", path, e)
+            if check:
+                self.prune()
+        self._remember(key, png)
+        return png
+
+    def prune(self, max_age: float = OG_IMAGE_DISK_MAX_AGE) -> int:
+        """
+        Delete disk images unused for max_age seconds, then the least recently used
+        beyond max_files. Returns number removed.
+        """
+        removed = 0
+        cutoff = time.time() - max_age
+        kept: list[tuple[float, Path]] = []
+        for path in self.cache_dir.glob("*/*.png"):
+            try:
+                mtime = os.stat(path).st_mtime
+                if mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+                else:
+                    kept.append((mtime, path))
+            except OSError:
+                pass
+        if self.max_files > 0 and len(kept) > self.max_files:
+            kept.sort()
+            for _, path in kept[: len(kept) - self.max_files]:
+                try:
+                    path.unlink()
+                    removed += 1
+                except OSError:
+                    pass
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "renders": self.renders,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+            }
+
+
+_renderer: Optional[OGImageRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> OGImageRenderer:
+    """The process-wide OG image renderer."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = OGImageRenderer()
+        return _renderer
@@ -0,0 +1,113 @@
+"""
+League-wide team stat rankings.
+harvest_rankings() refreshes every team's season statistics in one concurrent pass,
+packs their typed records (statnorm.py) into a teams x stats NumPy matrix and computes
+rank, percentile and z-score for every stat at once. The result is stored as
+data/{league}/rankings.json, so matchup and team pages look a team's standing up in
+one dict instead of relying on ESPN's per-team rankDisplayValue.
+"""
+
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+from archive import content_hash
+from harvester.espn_harvester import ESPNHarvester
+from jsonio import dumps
+from loader import load_records, load_teams
+from rosters import refresh_team_stats
+from statnorm import LOWER, stat_better, team_stat_records
+from storage import StatsStorage
+
+logger = logging.getLogger(__name__)
+
+
+def ordinal(n: int) -> str:
+    """1 -> "1st", 22 -> "22nd", 13 -> "13th"."""
+    suffix = "th" if 10 <= n % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    return f"{n}{suffix}"
+
+
+def compute_rankings(records: dict[str, dict[str, dict]]) -> dict[str, Any]:
+    """
+    Rankings for team id -> (stat name -> typed record). For each team and stat:
+    rank (1 = best, ties share the better rank), percentile (share of the other ranked
+    teams it is better than) and z (standard deviations from the league mean, signed
+    so positive is better). Stats a team has no value for are left out for that team.
+    """
+    team_ids = sorted(records)
+    names = sorted({name for recs in records.values() for name, r in recs.items() if r.get("value") is not None})
+    column = {name: j for j, name in enumerate(names)}
+    values = np.full((len(team_ids), len(names)), np.nan)
+    for i, team_id in enumerate(team_ids):
+        for name, r in records[team_id].items():
+            if r.get("value") is not None:
+                values[i, column[name]] = r["value"]
+
+    # Orient every column so higher is better; NaN compares False, so missing values never count
+    sign = np.array([-1.0 if stat_better(name) == LOWER else 1.0 for name in names])
+    oriented = values * sign
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    # [i, k, j]: team k beats team i on stat j
+    better = oriented[None, :, :] > oriented[:, None, :]
+    worse = oriented[None, :, :] < oriented[:, None, :]
+    ranks = 1 + better.sum(axis=1)
+    percentiles = worse.sum(axis=1) / np.maximum(count - 1, 1) * 100
+    mean = np.nanmean(values, axis=0) if len(team_ids) else np.zeros(len(names))
+    std = np.nanstd(values, axis=0) if len(team_ids) else np.zeros(len(names))
+    z = np.divide(values - mean, std, out=np.zeros_like(values), where=std > 0) * sign
+
+    teams: dict[str, dict[str, dict]] = {}
+    for i, team_id in enumerate(team_ids):
+        teams[team_id] = {
+            name: {
+                "rank": int(ranks[i, j]),
+                "percentile": round(float(percentiles[i, j]), 1),
+                "z": round(float(z[i, j]), 2),
+            }
+            for j, name in enumerate(names)
+            if valid[i, j]
+        }
+    stats = {
+        name: {"teams": int(count[j]), "mean": round(float(mean[j]), 4), "std": round(float(std[j]), 4),
+               "better": stat_better(name)}
+        for j, name in enumerate(names)
+    }
+    return {"stats": stats, "teams": teams}
+
+
+def harvest_rankings(harvester: ESPNHarvester, storage: StatsStorage, league_id: str, season: int) -> int:
+    """
+    Refresh stale team statistics for every team in load_teams(), then rank the league.
+    Saves rankings (only when an input changed); returns 1 if saved, else 0.
+    """
+    team_ids = [str(t["id"]) for t in load_teams(league_id, storage.data_dir) if t.get("id")]
+    refresh_team_stats(harvester, storage, league_id, team_ids, season)
+
+    records: dict[str, dict[str, dict]] = {}
+    stamps = []
+    for team_id in team_ids:
+        payload = storage.load_json(league_id, f"team_stats_{team_id}")
+        data = (payload or {}).get("data") or {}
+        if data.get("season") != season:
+            continue
+        records[team_id] = load_records(league_id, f"team_stats_{team_id}", storage.data_dir) or team_stat_records(data)
+        stamps.append((team_id, payload.get("harvested_at")))
+    if not records:
+        return 0
+
+    fingerprint = content_hash(dumps([season, stamps]))
+    stored = storage.load_json(league_id, "rankings")
+    if stored and (stored.get("data") or {}).get("fingerprint") == fingerprint:
+        return 0
+    doc = {"season": season, "fingerprint": fingerprint, **compute_rankings(records)}
+    storage.save_json(league_id, "rankings", doc)
+    logger.info("Ranked %d teams on %d stats for %s", len(records), len(doc["stats"]), league_id)
+    return 1
+
+
+def team_ranks(rankings: Optional[dict], team_id: str) -> dict[str, dict]:
+    """Stat name -> {"rank", "percentile", "z"} for one team ({} if the team isn't ranked)."""
+    return ((rankings or {}).get("teams") or {}).get(str(team_id)) or {}
@@ -0,0 +1,134 @@
+"""
+Rosters, team statistics and athlete profiles for the team and player pages.
+Harvested on a slow cadence for every team in load_teams() and stored as
+data/{league}/roster_{team_id}.json, team_stats_{team_id}.json and
+athlete_{athlete_id}.json (profile and season statistics together), each tagged
+with its season, so the page routes read a file and only call ESPN on a miss.
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from config import ATHLETE_MAX_AGE, ATHLETES_PER_RUN, ROSTER_MAX_AGE, TEAM_STATS_MAX_AGE
+from harvester.espn_harvester import ESPNHarvester
+from loader import load_teams
+from storage import StatsStorage
+
+logger = logging.getLogger(__name__)
+
+
+def roster_athletes(team: dict) -> list[dict]:
+    """Athletes on a team detail response (football rosters come grouped by position)."""
+    athletes = []
+    for item in team.get("athletes", []):
+        if "items" in item:
+            athletes.extend(item["items"])
+        else:
+            athletes.append(item)
+    return athletes
+
+
+def _stale(storage: StatsStorage, league_id: str, data_type: str, season: int, max_age: float) -> bool:
+    payload = storage.load_fresh(league_id, data_type, max_age)
+    return payload is None or (payload.get("data") or {}).get("season") != season
+
+
+def _refresh(
+    harvester: ESPNHarvester,
+    storage: StatsStorage,
+    league_id: str,
+    prefix: str,
+    ids: list[str],
+    season: int,
+    max_age: float,
+    fetch: Callable[[str], Optional[dict]],
+) -> int:
+    """Fetch {prefix}_{id} concurrently for every id whose stored copy is stale, and save it."""
+    stale = [i for i in ids if _stale(storage, league_id, f"{prefix}_{i}", season, max_age)]
+    fetched = harvester.gather({i: (lambda i=i: fetch(i)) for i in stale})
+    saved = 0
+    for i, data in fetched.items():
+        if data:
+            storage.save_json(league_id, f"{prefix}_{i}", {**data, "season": season})
+            saved += 1
+    return saved
+
+
+def _team_ids(league_id: str, data_dir: Path) -> list[str]:
+    return [str(team["id"]) for team in load_teams(league_id, data_dir) if team.get("id")]
+
+
+def refresh_team_stats(
+    harvester: ESPNHarvester, storage: StatsStorage, league_id: str, team_ids: list[str], season: int
+) -> int:
+    """Save team_stats_{team_id} for each team whose stored statistics are stale. Returns number saved."""
+    return _refresh(
+        harvester, storage, league_id, "team_stats", team_ids, season, TEAM_STATS_MAX_AGE,
+        lambda t: harvester.fetch_team_statistics(league_id, t, season, stale_ok=False),
+    )
+
+
+def harvest_rosters(harvester: ESPNHarvester, storage: StatsStorage, league_id: str, season: int) -> int:
+    """Save roster_{team_id} (record + roster) for every team. Returns number saved."""
+    return _refresh(
+        harvester, storage, league_id, "roster", _team_ids(league_id, storage.data_dir), season, ROSTER_MAX_AGE,
+        lambda t: harvester.fetch_team_detail(league_id, t, season, stale_ok=False),
+    )
+
+
+def harvest_team_stats(harvester: ESPNHarvester, storage: StatsStorage, league_id: str, season: int) -> int:
+    """Save team_stats_{team_id} for every team. Returns number saved."""
+    return refresh_team_stats(harvester, storage, league_id, _team_ids(league_id, storage.data_dir), season)
+
+
+def harvest_athletes(
+    harvester: ESPNHarvester,
+    storage: StatsStorage,
+    league_id: str,
+    season: int,
+    limit: int = ATHLETES_PER_RUN,
+) -> int:
+    """
+    Save athlete_{athlete_id} (profile + season statistics) for athletes on the stored rosters,
+    at most limit per run: missing ones first, then the longest since harvested. Returns number saved.
+    """
+    athlete_ids: list[str] = []
+    for team_id in _team_ids(league_id, storage.data_dir):
+        payload = storage.load_json(league_id, f"roster_{team_id}")
+        team = ((payload or {}).get("data") or {}).get("team") or {}
+        athlete_ids.extend(str(a["id"]) for a in roster_athletes(team) if a.get("id"))
+
+    ages: dict[str, str] = {}
+    for athlete_id in dict.fromkeys(athlete_ids):
+        if _stale(storage, league_id, f"athlete_{athlete_id}", season, ATHLETE_MAX_AGE):
+            payload = storage.load_json(league_id, f"athlete_{athlete_id}")
+            ages[athlete_id] = (payload or {}).get("harvested_at") or ""
+    due = sorted(ages, key=ages.get)[:limit]
+
+    calls: dict[tuple[str, str], Callable[[], Any]] = {}
+    for athlete_id in due:
+        calls[(athlete_id, "info")] = (
+            lambda a=athlete_id: harvester.fetch_athlete_info(league_id, a, season, stale_ok=False)
+        )
+        calls[(athlete_id, "statistics")] = (
+            lambda a=athlete_id: harvester.fetch_player_statistics(league_id, a, season, stale_ok=False)
+        )
+    fetched = harvester.gather(calls)
+    saved = 0
+    for athlete_id in due:
+        info, stats = fetched.get((athlete_id, "info")), fetched.get((athlete_id, "statistics"))
+        if info or stats:
+            storage.save_json(league_id, f"athlete_{athlete_id}", {"season": season, "info": info, "statistics": stats})
+            saved += 1
+    if len(ages) > len(due):
+        logger.info("%s athletes: %d saved, %d still due", league_id.upper(), saved, len(ages) - len(due))
+    return saved
+
+
+# Data type -> harvest function, in dependency order (athletes come from the stored rosters)
+TEAM_DATA_HARVESTERS = {
+    "rosters": harvest_rosters,
+    "team_stats": harvest_team_stats,
+    "athletes": harvest_athletes,
+}
@@ -0,0 +1,180 @@
+"""
+Adaptive harvest scheduler.
+Polls scoreboards every few seconds only for leagues with games in progress,
+backs off to hourly (or daily off-season) otherwise, harvests game summaries
+incrementally while games are live, and refreshes teams, standings and
+schedule on their own slower cadence.
+
+Only one process per data directory runs it: run_scheduler() waits until it
+holds data/scheduler.lock, so extra web workers (or a separate
+`main.py --daemon`) never multiply upstream requests.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from config import (
+    BASE_TYPE_INTERVALS,
+    COMPACT_INTERVAL,
+    DATA_DIR,
+    HARVEST_JOB_POLL_INTERVAL,
+    LEADER_RETRY_INTERVAL,
+    LEAGUES,
+    SCOREBOARD_IDLE_INTERVAL,
+    SCOREBOARD_LIVE_INTERVAL,
+    SCOREBOARD_OFFSEASON_INTERVAL,
+    SUMMARY_LIVE_INTERVAL,
+)
+from harvester.cache import ResponseCache
+from harvester.espn_harvester import ESPNHarvester, event_status
+from jobs import HarvestJobs
+from loader import load_scoreboard
+from locks import harvest_lock, leader_lock
+from og_image import OGImageRenderer
+from storage import StatsStorage
+
+logger = logging.getLogger(__name__)
+
+# Types harvested together for a scheduled task: summaries revalidate the scoreboard
+# first (usually a cheap 304) so they diff against current event status
+TASK_TYPES = {"game_summary": ["scoreboard", "game_summary"]}
+
+
+def _parse_event_time(value: str) -> Optional[float]:
+    """ESPN event dates look like 2025-02-01T00:30Z. Returns a Unix timestamp or None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def event_state(event: dict) -> str:
+    """ESPN status state for an event: 'pre', 'in' or 'post' ('' if missing)."""
+    return event_status(event)[0]
+
+
+def scoreboard_interval(league_id: str, scoreboard: Optional[dict], now: float) -> float:
+    """Seconds until a league's scoreboard should be polled again, from its current state."""
+    import main
+
+    events = (scoreboard or {}).get("events", [])
+    if any(event_state(e) == "in" for e in events):
+        return SCOREBOARD_LIVE_INTERVAL
+
+    today = datetime.fromtimestamp(now, tz=timezone.utc)
+    if not events and not main.in_season(league_id, today):
+        return SCOREBOARD_OFFSEASON_INTERVAL
+
+    interval = SCOREBOARD_IDLE_INTERVAL
+    for event in events:
+        if event_state(event) != "pre":
+            continue
+        start = _parse_event_time(event.get("date", ""))
+        if start is None:
+            continue
+        # Wake up at the scheduled start, then poll at the live cadence until it flips to 'in'
+        interval = min(interval, max(start - now, SCOREBOARD_LIVE_INTERVAL))
+    return interval
+
+
+class AdaptiveScheduler:
+    """
+    Runs main.run_harvest per (league, data type) when each is due, and /api/harvest jobs
+    (jobs.py) as soon as one is queued. Everything is due at startup, matching the old
+    run-once-then-loop behaviour.
+    """
+
+    def __init__(self, leagues: Optional[list[str]] = None, data_dir: Optional[Path] = None):
+        self.leagues = leagues or list(LEAGUES.keys())
+        self.data_dir = Path(data_dir or DATA_DIR)
+        self.types = ["scoreboard", "game_summary", *BASE_TYPE_INTERVALS]
+        self._due: dict[tuple[str, str], float] = {
+            (league_id, data_type): 0.0 for league_id in self.leagues for data_type in self.types
+        }
+        self._compact_due = time.time() + COMPACT_INTERVAL
+        # One harvester for every run: its session, response cache and validators persist between ticks
+        self.harvester = ESPNHarvester(data_dir=self.data_dir)
+        self.jobs = HarvestJobs(self.data_dir)
+        self.jobs.recover()
+
+    def _run(self, leagues: list[str], data_type: str) -> int:
+        import main
+
+        try:
+            types = TASK_TYPES.get(data_type, [data_type])
+            return main.run_harvest(leagues=leagues, types=types, output=self.data_dir, harvester=self.harvester)
+        except Exception as e:
+            logger.warning("Scheduled %s harvest failed for %s: %s", data_type, leagues, e)
+            return 0
+
+    def tick(self, now: Optional[float] = None) -> float:
+        """Run every due harvest. Returns seconds until the next one is due."""
+        now = now or time.time()
+        try:
+            self.jobs.run_pending(self.harvester)
+        except Exception as e:
+            logger.warning("Harvest job failed: %s", e)
+        for data_type in self.types:
+            leagues = [lg for lg in self.leagues if self._due[(lg, data_type)] <= now]
+            if not leagues:
+                continue
+            n = self._run(leagues, data_type)
+            logger.info("Scheduled %s harvest for %s: %d files saved", data_type, ",".join(leagues), n)
+            done = time.time()
+            for league_id in leagues:
+                if data_type in ("scoreboard", "game_summary"):
+                    board = load_scoreboard(league_id, self.data_dir)
+                    interval = scoreboard_interval(league_id, board, done)
+                    if data_type == "game_summary":
+                        interval = max(interval, SUMMARY_LIVE_INTERVAL)
+                else:
+                    interval = BASE_TYPE_INTERVALS[data_type]
+                self._due[(league_id, data_type)] = done + interval
+        if time.time() >= self._compact_due:
+            try:
+                # Compaction rewrites manifests and deletes blobs: never alongside a harvest
+                with harvest_lock(self.data_dir):
+                    StatsStorage(self.data_dir).compact()
+                ResponseCache(self.data_dir / "http_cache").prune()
+                OGImageRenderer(self.data_dir / "og_images", workers=0).prune()
+            except Exception as e:
+                logger.warning("Archive compaction failed: %s", e)
+            self._compact_due = time.time() + COMPACT_INTERVAL
+        next_due = min(min(self._due.values()), self._compact_due, time.time() + HARVEST_JOB_POLL_INTERVAL)
+        return max(1.0, next_due - time.time())
+
+    def run_forever(self, stop: Optional[threading.Event] = None) -> None:
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            stop.wait(self.tick())
+
+
+def run_scheduler(
+    leagues: Optional[list[str]] = None,
+    data_dir: Optional[Path] = None,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """
+    Become the scheduler leader for data_dir, then run the scheduler until stopped.
+    Non-leaders retry every LEADER_RETRY_INTERVAL, taking over if the leader exits.
+    """
+    stop = stop or threading.Event()
+    lock = leader_lock(data_dir)
+    while not stop.is_set():
+        if lock.acquire(blocking=False):
+            break
+        stop.wait(LEADER_RETRY_INTERVAL)
+    else:
+        return
+    logger.info("Scheduler leader for %s (pid %d)", lock.path.parent, os.getpid())
+    try:
+        AdaptiveScheduler(leagues, data_dir).run_forever(stop)
+    finally:
+        lock.release()
@@ -0,0 +1,247 @@
+"""
+Declarative payload schemas for harvested data.
+Each schema lists the fields our loaders, templates and API consumers read;
+project() drops everything else before the payload is stored.
+
+Spec format:
+    True          keep the value as-is
+    {"key": spec} keep only the listed keys of an object
+    [spec]        apply spec to every item of a list
+"""
+
+import re
+from typing import Any, Optional
+
+KEEP = True
+
+LOGOS = [{"href": KEEP, "rel": KEEP}]
+
+TEAM = {
+    "id": KEEP,
+    "uid": KEEP,
+    "abbreviation": KEEP,
+    "displayName": KEEP,
+    "shortDisplayName": KEEP,
+    "name": KEEP,
+    "location": KEEP,
+    "color": KEEP,
+    "alternateColor": KEEP,
+    "logo": KEEP,
+    "logos": LOGOS,
+}
+
+STATUS = {
+    "clock": KEEP,
+    "displayClock": KEEP,
+    "period": KEEP,
+    "type": {
+        "id": KEEP,
+        "name": KEEP,
+        "state": KEEP,
+        "completed": KEEP,
+        "description": KEEP,
+        "detail": KEEP,
+        "shortDetail": KEEP,
+    },
+}
+
+VENUE = {
+    "id": KEEP,
+    "fullName": KEEP,
+    "address": {"city": KEEP, "state": KEEP},
+    "indoor": KEEP,
+}
+
+COMPETITOR = {
+    "id": KEEP,
+    "homeAway": KEEP,
+    "winner": KEEP,
+    "score": KEEP,
+    "team": TEAM,
+    "records": [{"name": KEEP, "type": KEEP, "summary": KEEP}],
+}
+
+EVENT = {
+    "id": KEEP,
+    "uid": KEEP,
+    "date": KEEP,
+    "name": KEEP,
+    "shortName": KEEP,
+    "season": KEEP,
+    "week": KEEP,
+    "status": STATUS,
+    "competitions": [
+        {
+            "id": KEEP,
+            "date": KEEP,
+            "venue": VENUE,
+            "competitors": [COMPETITOR],
+            "status": STATUS,
+        }
+    ],
+}
+
+SCOREBOARD = {
+    "leagues": [{"id": KEEP, "name": KEEP, "abbreviation": KEEP, "season": KEEP}],
+    "season": KEEP,
+    "week": KEEP,
+    "day": KEEP,
+    "events": [EVENT],
+}
+
+TEAMS = {
+    "sports": [
+        {
+            "id": KEEP,
+            "name": KEEP,
+            "leagues": [
+                {"id": KEEP, "name": KEEP, "abbreviation": KEEP, "teams": [{"team": TEAM}]}
+            ],
+        }
+    ],
+}
+
+STANDINGS_ENTRY = {
+    "team": TEAM,
+    "stats": [
+        {
+            "name": KEEP,
+            "type": KEEP,
+            "abbreviation": KEEP,
+            "displayName": KEEP,
+            "value": KEEP,
+            "displayValue": KEEP,
+        }
+    ],
+}
+
+STANDINGS = {
+    "name": KEEP,
+    "season": KEEP,
+    "abbreviation": KEEP,
+    "fullViewLink": KEEP,
+    "children": [
+        {
+            "id": KEEP,
+            "name": KEEP,
+            "abbreviation": KEEP,
+            "standings": {"season": KEEP, "seasonType": KEEP, "entries": [STANDINGS_ENTRY]},
+            "entries": [STANDINGS_ENTRY],
+        }
+    ],
+}
+
+SUMMARY_STAT = {
+    "name": KEEP,
+    "label": KEEP,
+    "abbreviation": KEEP,
+    "displayValue": KEEP,
+}
+
+SUMMARY = {
+    "header": {
+        "id": KEEP,
+        "season": KEEP,
+        "competitions": [
+            {
+                "id": KEEP,
+                "date": KEEP,
+                "status": STATUS,
+                "competitors": [COMPETITOR],
+            }
+        ],
+    },
+    "boxscore": {
+        "teams": [{"team": TEAM, "homeAway": KEEP, "statistics": [SUMMARY_STAT]}],
+        "players": [
+            {
+                "team": {"id": KEEP, "abbreviation": KEEP, "displayName": KEEP},
+                "statistics": [
+                    {
+                        "name": KEEP,
+                        "keys": KEEP,
+                        "labels": KEEP,
+                        "athletes": [
+                            {
+                                "athlete": {
+                                    "id": KEEP,
+                                    "displayName": KEEP,
+                                    "shortName": KEEP,
+                                    "position": {"abbreviation": KEEP},
+                                },
+                                "starter": KEEP,
+                                "didNotPlay": KEEP,
+                                "stats": KEEP,
+                            }
+                        ],
+                    }
+                ],
+            }
+        ],
+    },
+    "gameInfo": {"venue": VENUE, "attendance": KEEP},
+}
+
+TEAM_STATS = {
+    "season": KEEP,  # added by rosters.py: the season requested
+    "results": {
+        "team": {"id": KEEP, "abbreviation": KEEP, "displayName": KEEP, "standingSummary": KEEP},
+        "stats": {
+            "categories": [
+                {
+                    "name": KEEP,
+                    "displayName": KEEP,
+                    "stats": [
+                        {
+                            "name": KEEP,
+                            "displayName": KEEP,
+                            "shortDisplayName": KEEP,
+                            "abbreviation": KEEP,
+                            "value": KEEP,
+                            "displayValue": KEEP,
+                            "rank": KEEP,
+                            "rankDisplayValue": KEEP,
+                        }
+                    ],
+                }
+            ]
+        },
+    },
+}
+
+# Base data type -> schema. Dated/per-event/per-team types (scoreboard_20250201, summary_401...)
+# use the schema of their base type; types without a schema are stored unchanged.
+SCHEMAS = {
+    "teams": TEAMS,
+    "standings": STANDINGS,
+    "scoreboard": SCOREBOARD,
+    "schedule": SCOREBOARD,
+    "summary": SUMMARY,
+    "team_stats": TEAM_STATS,
+}
+
+_SUFFIX = re.compile(r"_\d+$")
+
+
+def schema_for(data_type: str) -> Optional[Any]:
+    """Schema for a data type, or None if it is stored verbatim."""
+    return SCHEMAS.get(data_type) or SCHEMAS.get(_SUFFIX.sub("", data_type))
+
+
+def project(value: Any, spec: Any) -> Any:
+    """Return a copy of value keeping only the fields described by spec."""
+    if spec is KEEP or value is None:
+        return value
+    if isinstance(spec, list):
+        if isinstance(value, list):
+            return [project(item, spec[0]) for item in value]
+        return project(value, spec[0])
+    if isinstance(spec, dict) and isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in spec.items() if key in value}
+    return value
+
+
+def project_payload(data_type: str, data: Any) -> Any:
+    """Apply the data type's schema (no-op for types without one)."""
+    spec = schema_for(data_type)
+    return data if spec is None else project(data, spec)
@@ -2,7 +2,8 @@
 Sports Stats Web Server - Browse harvested data.
 Run: python serve.py
 Open: http://localhost:5000
-Harvests data every 15 mins when server is running.
+Harvests data while the server is running: live scoreboards every few seconds,
+idle leagues hourly, teams/standings/schedule on their own slower cadence.
 
 API endpoints (JSON) for Bragging Rights integration:
   GET /api/<league>/scoreboard
@@ -19,18 +20,45 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from datetime import datetime
-
-from flask import Flask, render_template, abort, request, jsonify, Response
-from io import BytesIO
-from config import DATA_DIR, LEAGUES
+from typing import Any, Optional
+
+from flask import Flask, render_template, abort, request, jsonify, Response, stream_with_context
+from config import (
+    API_MAX_AGE,
+    DATA_DIR,
+    LEAGUES,
+    OG_IMAGE_MAX_AGE,
+    SCHEDULER_IN_WEB,
+    SCOREBOARD_DATE_DAYS_AHEAD,
+    SCOREBOARD_DATE_DAYS_BACK,
+)
 from loader import (
+    cache_stats,
+    load_league_encoded,
+    load_athlete,
+    load_game_summary,
+    load_matchup,
+    load_rankings,
+    load_records,
+    load_team_roster,
+    load_team_stats,
     load_teams,
+    load_teams_encoded,
     load_standings,
     load_scoreboard,
+    load_scoreboard_for_date,
     load_schedule,
     load_news,
 )
-from harvester.espn_harvester import ESPNHarvester
+from gametime import SCOREBOARD_TZ, get_season_year
+from harvester.espn_harvester import ESPNHarvester, scoreboard_final, summary_status
+from jsonio import EncodedJSON
+from locks import gevent_worker
+from matchups import build_matchup, competitor_team_ids, matchup_competitors, summary_team_records
+from og_image import get_renderer, image_key, normalize
+from rankings import ordinal, team_ranks
+from schema import project_payload
+from storage import StatsStorage
 
 app = Flask(__name__, template_folder="templates", static_folder="static")
 
@@ -42,26 +70,17 @@ def add_cors_headers(response):
     response.headers["Access-Control-Allow-Headers"] = "Content-Type"
     return response
 
-harvester = ESPNHarvester()
-
-# Harvest scheduler (runs every 15 mins when server is up)
-def _scheduled_harvest_job():
-    import main
-    try:
-        n = main.run_harvest(quiet=True)
-        app.logger.info("Scheduled harvest: %d files saved", n)
-    except Exception as e:
-        app.logger.warning("Scheduled harvest failed: %s", e)
+app.jinja_env.filters["ordinal"] = ordinal
 
+harvester = ESPNHarvester()
+# Web requests store what they fetch (e.g. dated scoreboards) alongside harvested data
+storage = StatsStorage(DATA_DIR)
 
+# Harvest scheduler: live leagues every few seconds, idle/off-season leagues hourly/daily.
+# Every worker starts this thread, but only the one holding data/scheduler.lock harvests.
 def _run_scheduler():
-    import schedule
-    import time
-    schedule.every(15).minutes.do(_scheduled_harvest_job)
-    _scheduled_harvest_job()  # run once at startup
-    while True:
-        schedule.run_pending()
-        time.sleep(60)
+    from scheduler import run_scheduler
+    run_scheduler()
 
 
 def get_league_info(league_id: str):
@@ -72,73 +91,62 @@ def get_league_info(league_id: str):
 # --- OG Image for Bragging Rights poll sharing ---
 @app.route("/api/og-image")
 def api_og_image():
-    """Generate a PNG image of poll question + options for Facebook/social previews."""
+    """PNG of poll question + options for Facebook/social previews (cached; ETag is the image key)."""
+    question = request.args.get("question") or request.args.get("q") or ""
+    opts_param = request.args.get("opts") or request.args.get("options") or ""
+    question, options = normalize(question, opts_param.split(","))
+    key = image_key(question, options)
+    headers = {"ETag": f'"{key}"', "Cache-Control": f"public, max-age={OG_IMAGE_MAX_AGE}"}
+    if request.if_none_match.contains_weak(key):
+        return Response(status=304, headers=headers)
     try:
-        from PIL import Image, ImageDraw, ImageFont
-
-        question = request.args.get("question") or request.args.get("q") or "Bragging Rights Poll"
-        opts_param = request.args.get("opts") or request.args.get("options") or ""
-        options = [s.strip() for s in opts_param.split(",") if s.strip()] if opts_param else []
-
-        w, h = 1200, 630
-        img = Image.new("RGB", (w, h), color=(16, 22, 36))
-        draw = ImageDraw.Draw(img)
-
-        try:
-            font_lg = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 44)
-            font_md = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 26)
-        except OSError:
-            font_lg = font_md = ImageFont.load_default()
-
-        y = 50
-        draw.text((w // 2, y), "BRAGGING RIGHTS", fill=(63, 167, 255), font=font_md, anchor="mt")
-        y += 55
-        for line in _wrap_text(question, 45)[:3]:
-            draw.text((w // 2, y), line, fill=(230, 233, 240), font=font_lg, anchor="mt")
-            y += 50
-        y += 25
-        for i, opt in enumerate(options[:6]):
-            draw.rectangle([(100, y), (w - 100, y + 45)], fill=(34, 44, 74))
-            draw.text((130, y + 22), f"{i + 1}. {opt[:50]}", fill=(230, 233, 240), font=font_md)
-            y += 55
-        y += 20
-        draw.text((w // 2, y), "Vote at Bragging Rights", fill=(63, 167, 255), font=font_md, anchor="mt")
-
-        buf = BytesIO()
-        img.save(buf, format="PNG")
-        buf.seek(0)
-        return Response(buf.read(), mimetype="image/png", headers={"Cache-Control": "public, max-age=86400"})
+        png = get_renderer().get(key, question, options)
     except Exception as e:
         app.logger.warning("OG image generation failed: %s", e)
         abort(500)
-
-
-def _wrap_text(text: str, max_chars: int) -> list[str]:
-    words = text.split()
-    lines, current = [], ""
-    for w in words:
-        if len(current) + len(w) + 1 <= max_chars:
-            current = f"{current} {w}".strip() if current else w
-        else:
-            if current:
-                lines.append(current)
-            current = w
-    if current:
-        lines.append(current)
-    return lines
+    return Response(png, mimetype="image/png", headers=headers)
 
 
 # --- Harvest trigger (for UptimeRobot / cron to keep alive + refresh data) ---
 @app.route("/api/harvest")
 def api_harvest():
-    """Trigger harvest on demand. Ping this URL every 10-15 min to refresh stats and keep Render alive."""
-    import main
-    try:
-        n = main.run_harvest(quiet=True)
-        return jsonify({"ok": True, "files_saved": n})
-    except Exception as e:
-        app.logger.exception("Harvest failed")
-        return jsonify({"ok": False, "error": str(e)}), 500
+    """
+    Queue a harvest for the scheduler process and return at once with its job ID (202).
+    A request made while a harvest is queued or running joins that job. Ping this URL
+    every 10-15 min to keep Render alive.
+    """
+    from jobs import get_jobs
+
+    job, merged = get_jobs().submit()
+    return jsonify({
+        "ok": True,
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "merged": merged,
+        "status_url": f"/api/harvest/{job['job_id']}",
+    }), 202
+
+
+@app.route("/api/harvest/<job_id>")
+def api_harvest_status(job_id: str):
+    """Progress, per-league timings (seconds into the run) and files written for a harvest job."""
+    from jobs import get_jobs
+
+    job = get_jobs().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+
+@app.route("/api/cache-stats")
+def api_cache_stats():
+    """This worker's cache and request-coalescing counters."""
+    return jsonify({
+        "upstream_requests": harvester.flights.stats(),
+        "response_cache": harvester.cache.stats(),
+        "loader_cache": cache_stats(),
+        "og_images": get_renderer().stats(),
+    })
 
 
 # --- JSON API for Bragging Rights ---
@@ -147,6 +155,32 @@ def api_leagues():
     return jsonify(LEAGUES)
 
 
+def _json_response(
+    encoded: Optional[EncodedJSON], default: Any, max_age: int, immutable: bool = False
+) -> Response:
+    """
+    JSON response with a strong ETag (304 on If-None-Match), Cache-Control, and a br/gzip
+    body when the client accepts it, sent from precompressed bytes where available.
+    """
+    encoded = encoded or EncodedJSON.from_obj(default)
+    headers = {
+        "ETag": f'"{encoded.etag}"',
+        "Cache-Control": f"public, max-age={max_age}" + (", immutable" if immutable else ""),
+        "Vary": "Accept-Encoding",
+    }
+    if request.if_none_match.contains_weak(encoded.etag):
+        return Response(status=304, headers=headers)
+    body = None
+    if request.accept_encodings.quality("br") > 0:
+        body = encoded.br()
+        if body is not None:
+            headers["Content-Encoding"] = "br"
+    if body is None and request.accept_encodings.quality("gzip") > 0:
+        body = encoded.gzip()
+        headers["Content-Encoding"] = "gzip"
+    return Response(bytes(body if body is not None else encoded.body), mimetype="application/json", headers=headers)
+
+
 @app.route("/api/<league_id>/scoreboard")
 def api_scoreboard(league_id: str):
     if league_id not in LEAGUES:
@@ -154,21 +188,74 @@ def api_scoreboard(league_id: str):
     date_str = request.args.get("date")  # YYYYMMDD
     if date_str:
         try:
-            dt = datetime.strptime(date_str, "%Y%m%d")
-            data = harvester.harvest_scoreboard(league_id, dt)
-            return jsonify(data or {"events": []})
+            date = datetime.strptime(date_str, "%Y%m%d")
         except ValueError:
-            pass
-    data = load_scoreboard(league_id)
-    return jsonify(data or {"events": []})
+            date = None
+        if date is not None:
+            today = datetime.now(SCOREBOARD_TZ).replace(tzinfo=None)
+            if not -SCOREBOARD_DATE_DAYS_BACK <= (date - today).days <= SCOREBOARD_DATE_DAYS_AHEAD:
+                abort(400)
+            return _dated_scoreboard(league_id, date)
+    return _json_response(load_league_encoded(league_id, "scoreboard"), {"events": []}, API_MAX_AGE["scoreboard"])
+
+
+def _dated_scoreboard(league_id: str, date: datetime) -> Response:
+    """
+    Scoreboard for a day, from the stored scoreboard_{date} when that day is over and final
+    (it can't change). Otherwise fetched through the response cache; a fetch is stored only
+    once it is final too, so open or empty days never add files.
+    """
+    date_str = date.strftime("%Y%m%d")
+    data_type = f"scoreboard_{date_str}"
+    if not scoreboard_final(load_scoreboard_for_date(league_id, date_str), date_str):
+        data = harvester.fetch_scoreboard(league_id, date)
+        projected = project_payload(data_type, data) if data else None
+        if not scoreboard_final(projected, date_str):
+            # Today's file (written by the harvester) stands in if the fetch failed
+            encoded = EncodedJSON.from_obj(projected) if projected else load_league_encoded(league_id, data_type)
+            past = date_str < datetime.now(SCOREBOARD_TZ).strftime("%Y%m%d")
+            max_age = API_MAX_AGE["past_scoreboard"] if past else API_MAX_AGE["scoreboard"]
+            return _json_response(encoded, {"events": []}, max_age)
+        storage.save_json(league_id, data_type, data)
+    encoded = load_league_encoded(league_id, data_type)
+    return _json_response(encoded, {"events": []}, API_MAX_AGE["final_scoreboard"], immutable=True)
+
+
+@app.route("/api/<league_id>/scoreboard/stream")
+def api_scoreboard_stream(league_id: str):
+    """Server-Sent Events: all events once, then only events whose score, clock or status changed."""
+    if league_id not in LEAGUES:
+        abort(404)
+    return _scoreboard_stream([league_id])
+
+
+@app.route("/api/scoreboard/stream")
+def api_scoreboards_stream():
+    """
+    The same stream for several leagues on one connection (?leagues=nba,nfl; default all),
+    so a page showing every league stays within the browser's per-host connection limit.
+    """
+    league_ids = [lg for lg in request.args.get("leagues", "").split(",") if lg] or list(LEAGUES)
+    if any(lg not in LEAGUES for lg in league_ids):
+        abort(404)
+    return _scoreboard_stream(list(dict.fromkeys(league_ids)))
+
+
+def _scoreboard_stream(league_ids: list[str]) -> Response:
+    from live import get_broadcaster
+
+    return Response(
+        stream_with_context(get_broadcaster().stream(league_ids)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.route("/api/<league_id>/teams")
 def api_teams(league_id: str):
     if league_id not in LEAGUES:
         abort(404)
-    team_list = load_teams(league_id)
-    return jsonify(team_list)
+    return _json_response(load_teams_encoded(league_id), [], API_MAX_AGE["teams"])
 
 
 @app.route("/api/<league_id>/team/<team_id>")
@@ -176,8 +263,10 @@ def api_team_detail(league_id: str, team_id: str):
     """Return team detail with roster (JSON) for league page."""
     if league_id not in LEAGUES:
         abort(404)
-    season = request.args.get("season", type=int) or datetime.now().year
-    team_data = harvester.fetch_team_detail(league_id, team_id, season)
+    season = request.args.get("season", type=int) or get_season_year(league_id)
+    team_data = load_team_roster(league_id, team_id, season) or harvester.fetch_team_detail(
+        league_id, team_id, season
+    )
     if not team_data or "team" not in team_data:
         return jsonify({"error": "Team not found"}), 404
     team = team_data["team"]
@@ -188,135 +277,62 @@ def api_team_detail(league_id: str, team_id: str):
 def api_standings(league_id: str):
     if league_id not in LEAGUES:
         abort(404)
-    data = load_standings(league_id)
-    return jsonify(data or {})
+    return _json_response(load_league_encoded(league_id, "standings"), {}, API_MAX_AGE["standings"])
 
 
 @app.route("/api/<league_id>/schedule")
 def api_schedule(league_id: str):
     if league_id not in LEAGUES:
         abort(404)
-    data = load_schedule(league_id)
-    return jsonify(data or {"events": []})
+    return _json_response(load_league_encoded(league_id, "schedule"), {"events": []}, API_MAX_AGE["schedule"])
+
+
+def _matchup(league_id: str, event_id: str, season: int) -> Optional[dict]:
+    """
+    Stored matchup document for the season, built live only on a miss: from the stored summary
+    and its typed records when the game is final, otherwise from a fresh ESPN summary.
+    """
+    doc = load_matchup(league_id, event_id)
+    if doc and doc.get("season") == season:
+        return doc
+    summary, game_records = load_game_summary(league_id, event_id), None
+    if summary and summary_status(summary)[0] == "post":
+        game_records = summary_team_records(load_records(league_id, f"summary_{event_id}"))
+    else:
+        summary = harvester.harvest_game_summary(league_id, event_id)
+    if not summary:
+        return None
+    competitors = matchup_competitors(summary)
+    team_ids = competitor_team_ids(competitors)
+    team_stats = {team_id: load_team_stats(league_id, team_id, season) for team_id in team_ids}
+    # Typed records were saved with the stored statistics; only fetched ones are normalized here
+    team_records = {
+        team_id: load_records(league_id, f"team_stats_{team_id}")
+        for team_id in team_ids
+        if team_stats[team_id] is not None
+    }
+    team_stats.update(harvester.fan_out({
+        team_id: (lambda t=team_id: harvester.fetch_team_statistics(league_id, t, season))
+        for team_id in team_ids
+        if team_stats[team_id] is None
+    }))
+    return build_matchup(
+        league_id, event_id, season, competitors, team_stats, summary.get("gameInfo"),
+        team_records, load_rankings(league_id, season), game_records,
+    )
 
 
 @app.route("/api/<league_id>/matchup/<event_id>")
 def api_matchup(league_id: str, event_id: str):
     if league_id not in LEAGUES:
         abort(404)
-    season = request.args.get("season", type=int) or datetime.now().year
-    summary = harvester.harvest_game_summary(league_id, event_id)
-    if not summary:
+    season = request.args.get("season", type=int) or get_season_year(league_id)
+    doc = _matchup(league_id, event_id, season)
+    if not doc:
         return jsonify({"error": "Game not found"}), 404
-    box = summary.get("boxscore", {})
-    comps = box.get("teams", [])
-    if not comps:
-        header = summary.get("header", {})
-        comps = (header.get("competitions") or [{}])[0].get("competitors", [])
-    teams_data = []
-    for t in comps:
-        team = t.get("team", t) if isinstance(t.get("team"), dict) else (t if isinstance(t, dict) else {})
-        team_id = team.get("id") or t.get("id")
-        standing_summary = ""
-        cats = []
-        if team_id:
-            stats = harvester.fetch_team_statistics(league_id, team_id, season)
-            if stats:
-                res = stats.get("results", {})
-                cats = (res.get("stats", {}).get("categories", [])) or []
-                standing_summary = res.get("team", {}).get("standingSummary", "") or ""
-        teams_data.append({"team": team, "stat_categories": cats, "standing_summary": standing_summary})
-    while len(teams_data) < 2:
-        teams_data.append({"team": {}, "stat_categories": [], "standing_summary": ""})
-    team_a, team_b = teams_data[0], teams_data[1]
-    comparison = []
-    stats_a = {s["name"]: {"display": s.get("displayValue", ""), "label": s.get("shortDisplayName") or s.get("displayName", s["name"]), "leagueRank": s.get("rankDisplayValue", "")}
-               for cat in team_a.get("stat_categories", []) for s in cat.get("stats", [])}
-    stats_b = {s["name"]: {"display": s.get("displayValue", ""), "label": s.get("shortDisplayName") or s.get("displayName", s["name"]), "leagueRank": s.get("rankDisplayValue", "")}
-               for cat in team_b.get("stat_categories", []) for s in cat.get("stats", [])}
-    LOWER_IS_BETTER = {"goalsagainst", "goalsagainstaverage", "losses", "overtimelosses", "faceoffslost", "penaltyminutes"}
-    def parse_num(v):
-        try:
-            s = str(v).replace(",", "")
-            return float("".join(c for c in s if c.isdigit() or c == ".") or "0")
-        except (ValueError, TypeError):
-            return 0
-    def parse_for_bar(v):
-        s = str(v).strip()
-        if ":" in s and "." not in s:
-            parts = s.split(":")
-            try:
-                return int(parts[0]) * 60 + int(parts[-1]) if len(parts) >= 2 else parse_num(v)
-            except (ValueError, TypeError):
-                return parse_num(v)
-        return parse_num(v)
-    for name in sorted(stats_a.keys() & stats_b.keys()):
-        va, vb = stats_a[name]["display"], stats_b[name]["display"]
-        na_raw, nb_raw = parse_for_bar(va), parse_for_bar(vb)
-        lower_better = name.lower() in LOWER_IS_BETTER or "against" in name.lower() or "loss" in name.lower()
-        na, nb = na_raw, nb_raw
-        if lower_better and (na_raw > 0 or nb_raw > 0):
-            m = max(na_raw, nb_raw)
-            na, nb = m - na_raw, m - nb_raw
-        total = na + nb
-        pct_a = (na / total * 100) if total > 0 else 50
-        pct_b = (nb / total * 100) if total > 0 else 50
-        if lower_better:
-            rank_a = 1 if na_raw < nb_raw else (2 if na_raw > nb_raw else 1)
-            rank_b = 1 if nb_raw < na_raw else (2 if nb_raw > na_raw else 1)
-        else:
-            rank_a = 1 if na_raw > nb_raw else (2 if na_raw < nb_raw else 1)
-            rank_b = 1 if nb_raw > na_raw else (2 if nb_raw < na_raw else 1)
-        league_rank_a = stats_a[name].get("leagueRank", "")
-        league_rank_b = stats_b[name].get("leagueRank", "")
-        comparison.append({"label": stats_a[name]["label"], "a": va, "b": vb, "pct_a": round(pct_a, 1), "pct_b": round(pct_b, 1), "rank_a": rank_a, "rank_b": rank_b, "leagueRank_a": league_rank_a, "leagueRank_b": league_rank_b})
-    game_comparison = []
-    stat_map = {
-        "fieldGoalsMade-fieldGoalsAttempted": ("FG", "fg"), "fieldGoalPct": ("FG %", "pct"),
-        "threePointFieldGoalsMade-threePointFieldGoalsAttempted": ("3PT", "fg"), "threePointFieldGoalPct": ("3PT %", "pct"),
-        "freeThrowsMade-freeThrowsAttempted": ("FT", "fg"), "freeThrowPct": ("FT %", "pct"),
-        "totalRebounds": ("Rebounds", "num"), "offensiveRebounds": ("Off. Rebounds", "num"),
-        "assists": ("Assists", "num"), "steals": ("Steals", "num"), "blocks": ("Blocks", "num"),
-        "turnovers": ("Turnovers", "num"), "fouls": ("Fouls", "num"),
-    }
-    game_stats_a = {s["name"]: {"display": s.get("displayValue", ""), "label": s.get("label") or s.get("abbreviation", s["name"])}
-                    for s in (comps[0].get("statistics", []) if len(comps) > 0 else [])}
-    game_stats_b = {s["name"]: {"display": s.get("displayValue", ""), "label": s.get("label") or s.get("abbreviation", s["name"])}
-                    for s in (comps[1].get("statistics", []) if len(comps) > 1 else [])}
-    for stat_name, (label, fmt) in stat_map.items():
-        va = game_stats_a.get(stat_name, {}).get("display", "")
-        vb = game_stats_b.get(stat_name, {}).get("display", "")
-        if not va and not vb:
-            continue
-        def _parse_val(v, f):
-            if f == "pct":
-                try:
-                    return float("".join(c for c in str(v) if c.isdigit() or c == "."))
-                except (ValueError, TypeError):
-                    return 0
-            if f == "fg" and "-" in str(v):
-                parts = str(v).split("-")
-                try:
-                    return float(parts[0]) / max(1, float(parts[1])) * 100 if len(parts) == 2 else 0
-                except (ValueError, TypeError):
-                    return 0
-            try:
-                return float("".join(c for c in str(v) if c.isdigit() or c == "."))
-            except (ValueError, TypeError):
-                return 0
-        na, nb = _parse_val(va, fmt), _parse_val(vb, fmt)
-        total = na + nb
-        pct_a = (na / total * 100) if total > 0 else 50
-        pct_b = (nb / total * 100) if total > 0 else 50
-        game_comparison.append({"label": label, "a": va, "b": vb, "pct_a": pct_a, "pct_b": pct_b})
     return jsonify({
-        "league_id": league_id,
-        "event_id": event_id,
-        "team_a": team_a,
-        "team_b": team_b,
-        "comparison": comparison,
-        "game_comparison": game_comparison,
-        "game_info": summary.get("gameInfo", {}),
+        key: doc[key]
+        for key in ("league_id", "event_id", "team_a", "team_b", "comparison", "game_comparison", "game_info")
     })
 
 
@@ -360,106 +376,20 @@ def matchup(league_id: str, event_id: str):
     """Matchup: game details + side-by-side team stats comparison."""
     if league_id not in LEAGUES:
         abort(404)
-    season = request.args.get("season", type=int) or datetime.now().year
-    summary = harvester.harvest_game_summary(league_id, event_id)
-    if not summary:
+    season = request.args.get("season", type=int) or get_season_year(league_id)
+    doc = _matchup(league_id, event_id, season)
+    if not doc:
         abort(404)
-    box = summary.get("boxscore", {})
-    comps = box.get("teams", [])
-    if not comps:
-        header = summary.get("header", {})
-        comps = (header.get("competitions") or [{}])[0].get("competitors", [])
-    teams_data = []
-    for t in comps:
-        team = t.get("team", t) if isinstance(t.get("team"), dict) else (t if isinstance(t, dict) else {})
-        team_id = team.get("id") or t.get("id")
-        standing_summary = ""
-        cats = []
-        if team_id:
-            stats = harvester.fetch_team_statistics(league_id, team_id, season)
-            if stats:
-                res = stats.get("results", {})
-                cats = (res.get("stats", {}).get("categories", [])) or []
-                standing_summary = res.get("team", {}).get("standingSummary", "") or ""
-        teams_data.append({"team": team, "stat_categories": cats, "standing_summary": standing_summary})
-    while len(teams_data) < 2:
-        teams_data.append({"team": {}, "stat_categories": [], "standing_summary": ""})
-    team_a, team_b = teams_data[0], teams_data[1]
-    comparison = []
-    stats_a = {}
-    for cat in team_a.get("stat_categories", []):
-        for s in cat.get("stats", []):
-            stats_a[s["name"]] = {"display": s.get("displayValue", ""), "label": s.get("shortDisplayName") or s.get("displayName", s["name"])}
-    stats_b = {}
-    for cat in team_b.get("stat_categories", []):
-        for s in cat.get("stats", []):
-            stats_b[s["name"]] = {"display": s.get("displayValue", ""), "label": s.get("shortDisplayName") or s.get("displayName", s["name"])}
-    for name in sorted(stats_a.keys() & stats_b.keys()):
-        comparison.append({"label": stats_a[name]["label"], "a": stats_a[name]["display"], "b": stats_b[name]["display"]})
-
-    # Game stats (During/After) from boxscore - with numeric values for bar charts
-    game_comparison = []
-    stat_map = {
-        "fieldGoalsMade-fieldGoalsAttempted": ("FG", "fg"),
-        "fieldGoalPct": ("FG %", "pct"),
-        "threePointFieldGoalsMade-threePointFieldGoalsAttempted": ("3PT", "fg"),
-        "threePointFieldGoalPct": ("3PT %", "pct"),
-        "freeThrowsMade-freeThrowsAttempted": ("FT", "fg"),
-        "freeThrowPct": ("FT %", "pct"),
-        "totalRebounds": ("Rebounds", "num"),
-        "offensiveRebounds": ("Off. Rebounds", "num"),
-        "assists": ("Assists", "num"),
-        "steals": ("Steals", "num"),
-        "blocks": ("Blocks", "num"),
-        "turnovers": ("Turnovers", "num"),
-        "fouls": ("Fouls", "num"),
-    }
-    game_stats_a = {}
-    game_stats_b = {}
-    for i, t in enumerate(comps[:2]):
-        gs = {s["name"]: {"display": s.get("displayValue", ""), "label": s.get("label") or s.get("abbreviation", s["name"])}
-            for s in t.get("statistics", [])}
-        if i == 0:
-            game_stats_a = gs
-        else:
-            game_stats_b = gs
-    for stat_name, (label, fmt) in stat_map.items():
-        va, vb = game_stats_a.get(stat_name, {}).get("display", ""), game_stats_b.get(stat_name, {}).get("display", "")
-        if not va and not vb:
-            continue
-        def _parse_val(v, f):
-            if f == "pct":
-                try:
-                    return float("".join(c for c in str(v) if c.isdigit() or c == "."))
-                except (ValueError, TypeError):
-                    return 0
-            if f == "fg" and "-" in str(v):
-                parts = str(v).split("-")
-                try:
-                    return float(parts[0]) / max(1, float(parts[1])) * 100 if len(parts) == 2 else 0
-                except (ValueError, TypeError):
-                    return 0
-            try:
-                return float("".join(c for c in str(v) if c.isdigit() or c == "."))
-            except (ValueError, TypeError):
-                return 0
-        na, nb = _parse_val(va, fmt), _parse_val(vb, fmt)
-        total = na + nb
-        pct_a = (na / total * 100) if total > 0 else 50
-        pct_b = (nb / total * 100) if total > 0 else 50
-        game_comparison.append({"label": label, "a": va, "b": vb, "pct_a": pct_a, "pct_b": pct_b})
-
-    game_info = summary.get("gameInfo", {})
     return render_template(
         "matchup.html",
         league_id=league_id,
         league_name=get_league_info(league_id)["name"],
         event_id=event_id,
-        team_a=team_a,
-        team_b=team_b,
-        comparison=comparison,
-        game_comparison=game_comparison,
-        game_info=game_info,
+        team_a=doc["team_a"],
+        team_b=doc["team_b"],
+        comparison=doc["comparison"],
+        game_comparison=doc["game_comparison"],
+        game_info=doc["game_info"],
         season=season,
     )
 
@@ -525,9 +455,17 @@ def team_detail(league_id: str, team_id: str):
     """Team detail: record, stats with rankings, roster."""
     if league_id not in LEAGUES:
         abort(404)
-    season = request.args.get("season", type=int) or datetime.now().year
-    team_data = harvester.fetch_team_detail(league_id, team_id, season)
-    team_stats = harvester.fetch_team_statistics(league_id, team_id, season)
+    season = request.args.get("season", type=int) or get_season_year(league_id)
+    team_data = load_team_roster(league_id, team_id, season)
+    team_stats = load_team_stats(league_id, team_id, season)
+    live = {}
+    if team_data is None:
+        live["detail"] = lambda: harvester.fetch_team_detail(league_id, team_id, season)
+    if team_stats is None:
+        live["stats"] = lambda: harvester.fetch_team_statistics(league_id, team_id, season)
+    fetched = harvester.fan_out(live)
+    team_data = team_data or fetched.get("detail")
+    team_stats = team_stats or fetched.get("stats")
     if not team_data or "team" not in team_data:
         abort(404)
     team = team_data["team"]
@@ -544,6 +482,7 @@ def team_detail(league_id: str, team_id: str):
         athletes=athletes,
         stat_categories=stat_categories,
         standing_summary=stats_result.get("team", {}).get("standingSummary", ""),
+        ranks=team_ranks(load_rankings(league_id, season), team_id),
         season=season,
     )
 
@@ -553,9 +492,16 @@ def player_detail(league_id: str, player_id: str):
     """Player detail: stats with league rankings, historical seasons."""
     if league_id not in LEAGUES:
         abort(404)
-    season = request.args.get("season", type=int) or datetime.now().year
-    player_info = harvester.fetch_athlete_info(league_id, player_id, season)
-    stats_data = harvester.fetch_player_statistics(league_id, player_id, season)
+    season = request.args.get("season", type=int) or get_season_year(league_id)
+    athlete = load_athlete(league_id, player_id, season)
+    if athlete:
+        player_info, stats_data = athlete.get("info"), athlete.get("statistics")
+    else:
+        fetched = harvester.fan_out({
+            "info": lambda: harvester.fetch_athlete_info(league_id, player_id, season),
+            "stats": lambda: harvester.fetch_player_statistics(league_id, player_id, season),
+        })
+        player_info, stats_data = fetched["info"], fetched["stats"]
     if not stats_data and not player_info:
         abort(404)
     splits = stats_data.get("splits", {}) if stats_data else {}
@@ -572,14 +518,21 @@ def player_detail(league_id: str, player_id: str):
     )
 
 
-# Start scheduler when module loads (for gunicorn/Render)
-scheduler_thread = threading.Thread(target=_run_scheduler, daemon=True)
-scheduler_thread.start()
+# Start scheduler when module loads (for gunicorn/Render), unless STATS_SCHEDULER=0.
+# Not in OG image render workers: they are spawned, and spawning re-imports the main module
+# Not in a gevent worker either: its "threads" are greenlets, so a harvest would stall every
+# request and stream on the event loop. Run `python main.py --daemon` beside it instead.
+if SCHEDULER_IN_WEB and __name__ != "__mp_main__":
+    if gevent_worker():
+        app.logger.warning("gevent worker: scheduler thread not started; run `python main.py --daemon`")
+    else:
+        scheduler_thread = threading.Thread(target=_run_scheduler, daemon=True)
+        scheduler_thread.start()
 
 if __name__ == "__main__":
     import os
     print("Sports Stats Web Interface")
     print("http://localhost:5000")
-    print("Harvest runs every 15 mins (and once at startup).\n")
+    print("Harvest runs at startup, then adaptively (live games every few seconds).\n")
     port = int(os.environ.get("PORT", 5000))
     app.run(debug=True, port=port)
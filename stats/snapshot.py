@@ -0,0 +1,234 @@
+"""
+Shared, versioned read-only data snapshot for web workers.
+
+After each harvest the harvester publishes one immutable file,
+data/snapshots/snapshot-{version}.bin, and then atomically points
+data/snapshots/CURRENT at it. Every worker memory-maps the current version, so
+the bytes live once in the OS page cache no matter how many workers read them,
+and switches to a new version by swapping a single reference.
+
+File layout:
+    MAGIC (8 bytes) | index length (8 bytes, little-endian) | index JSON | data section
+The index maps "league/data_type" -> {"offset", "length", "gzip", "br", "etag", "harvested_at"}:
+each entry's bytes are the compact JSON of that payload's "data", followed by its gzip (and,
+when brotli is installed, br) encoding at the [offset, length] given, ready to send as-is.
+"""
+
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from config import DATA_DIR, SNAPSHOT_CHECK_INTERVAL, SNAPSHOT_KEEP_VERSIONS, SNAPSHOT_TYPES
+from jsonio import EncodedJSON, atomic_write, brotli_bytes, dumps, gzip_bytes, loads, read_json
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BRSNAP2\n"
+_HEADER = struct.Struct("<8sQ")
+
+
+def snapshot_dir(data_dir: Optional[Path] = None) -> Path:
+    return Path(data_dir or DATA_DIR) / "snapshots"
+
+
+def _current_version(base: Path) -> int:
+    try:
+        return int((base / "CURRENT").read_text().strip().split("-")[-1].split(".")[0])
+    except (OSError, ValueError):
+        return 0
+
+
+def _previous_version(base: Path) -> Optional["SnapshotVersion"]:
+    try:
+        return SnapshotVersion(base / (base / "CURRENT").read_text().strip())
+    except (OSError, ValueError):
+        return None
+
+
+def publish_snapshot(data_dir: Optional[Path] = None) -> Optional[Path]:
+    """
+    Pack the current file of every SNAPSHOT_TYPES data type into a new snapshot version
+    and make it current. Returns the snapshot path (None if there was nothing to publish).
+    Entries whose ETag matches the current version reuse its gzip/br bytes; only
+    changed entries are compressed again.
+    """
+    data_dir = Path(data_dir or DATA_DIR)
+    base = snapshot_dir(data_dir)
+    previous = _previous_version(base)
+    index: dict[str, dict[str, Any]] = {}
+    chunks: list[bytes] = []
+    offset = 0
+    for league_dir in sorted(p for p in data_dir.iterdir() if p.is_dir() and p != base):
+        for data_type in SNAPSHOT_TYPES:
+            path = league_dir / f"{data_type}.json"
+            if not path.exists():
+                continue
+            try:
+                payload = read_json(path)
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping %s in snapshot: %s", path, e)
+                continue
+            key = f"{league_dir.name}/{data_type}"
+            encoded = EncodedJSON(dumps(payload.get("data", payload)))
+            entry = {
+                "offset": offset,
+                "length": len(encoded.body),
+                "etag": encoded.etag,
+                "harvested_at": payload.get("harvested_at"),
+            }
+            chunks.append(encoded.body)
+            offset += len(encoded.body)
+            before = previous.entries.get(key) if previous is not None else None
+            if before is not None and before["etag"] == encoded.etag:
+                variants = [(name, bytes(previous._slice(*before[name]))) for name in ("gzip", "br") if name in before]
+            else:
+                variants = [("gzip", gzip_bytes(encoded.body)), ("br", brotli_bytes(encoded.body))]
+            for name, variant in variants:
+                if variant is not None:
+                    entry[name] = [offset, len(variant)]
+                    chunks.append(variant)
+                    offset += len(variant)
+            index[key] = entry
+    if not index:
+        return None
+
+    base.mkdir(parents=True, exist_ok=True)
+    version = _current_version(base) + 1
+    index_bytes = dumps({"version": version, "created_at": time.time(), "entries": index})
+    path = base / f"snapshot-{version}.bin"
+    atomic_write(path, b"".join([_HEADER.pack(MAGIC, len(index_bytes)), index_bytes, *chunks]))
+    atomic_write(base / "CURRENT", path.name.encode())
+
+    # Older versions can go: workers that still have one mapped keep their mapping (POSIX)
+    for old in base.glob("snapshot-*.bin"):
+        try:
+            if int(old.stem.split("-")[1]) <= version - SNAPSHOT_KEEP_VERSIONS:
+                old.unlink()
+        except (OSError, ValueError):
+            pass
+    return path
+
+
+class SnapshotVersion:
+    """One mapped snapshot file. Immutable; parsed payloads are memoized per version."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_len = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not a snapshot file: {path}")
+        start = _HEADER.size
+        index = loads(self._mmap[start : start + index_len])
+        self.version: int = index["version"]
+        self.entries: dict[str, dict[str, Any]] = index["entries"]
+        self._data_start = start + index_len
+        self._view = memoryview(self._mmap)
+        self._memo: dict[tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def has(self, league_id: str, data_type: str) -> bool:
+        return f"{league_id}/{data_type}" in self.entries
+
+    def data_bytes(self, league_id: str, data_type: str) -> Optional[memoryview]:
+        """Zero-copy view of the entry's compact JSON (the payload's "data")."""
+        entry = self.entries.get(f"{league_id}/{data_type}")
+        if entry is None:
+            return None
+        return self._slice(entry["offset"], entry["length"])
+
+    def _slice(self, offset: int, length: int) -> memoryview:
+        start = self._data_start + offset
+        return self._view[start : start + length]
+
+    def encoded(self, league_id: str, data_type: str) -> Optional[EncodedJSON]:
+        """The entry as a response body with its ETag and precompressed variants (zero-copy views)."""
+        entry = self.entries.get(f"{league_id}/{data_type}")
+        if entry is None:
+            return None
+        return EncodedJSON(
+            self._slice(entry["offset"], entry["length"]),
+            etag=entry["etag"],
+            gzip_body=self._slice(*entry["gzip"]) if "gzip" in entry else None,
+            br_body=self._slice(*entry["br"]) if "br" in entry else None,
+        )
+
+    def derived(self, league_id: str, data_type: str, name: str, build: Callable[[Any], Any]) -> Any:
+        """build(payload) for an entry, computed once per snapshot version."""
+        key = (f"{league_id}/{data_type}", name)
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        payload = self.payload(league_id, data_type) if name != "payload" else None
+        value = build(payload)
+        with self._lock:
+            return self._memo.setdefault(key, value)
+
+    def payload(self, league_id: str, data_type: str) -> Optional[dict]:
+        """Payload in the same shape as the on-disk file (league, data_type, harvested_at, data)."""
+        entry = self.entries.get(f"{league_id}/{data_type}")
+        if entry is None:
+            return None
+
+        def build(_):
+            return {
+                "league": league_id,
+                "data_type": data_type,
+                "harvested_at": entry["harvested_at"],
+                "data": loads(bytes(self.data_bytes(league_id, data_type))),
+            }
+
+        return self.derived(league_id, data_type, "payload", build)
+
+
+class SnapshotReader:
+    """Per-process handle on the current snapshot; re-checks CURRENT at most once per interval."""
+
+    def __init__(self, data_dir: Optional[Path] = None, check_interval: float = SNAPSHOT_CHECK_INTERVAL):
+        self.base = snapshot_dir(data_dir)
+        self.check_interval = check_interval
+        self._current: Optional[SnapshotVersion] = None
+        self._stamp: Optional[tuple[int, int]] = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def current(self) -> Optional[SnapshotVersion]:
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return self._current
+        with self._lock:
+            self._checked = now
+            pointer = self.base / "CURRENT"
+            try:
+                st = os.stat(pointer)
+            except FileNotFoundError:
+                self._current = None
+                return None
+            stamp = (st.st_mtime_ns, st.st_size)
+            if stamp != self._stamp:
+                try:
+                    name = pointer.read_text().strip()
+                    self._current = SnapshotVersion(self.base / name)
+                    self._stamp = stamp
+                except (OSError, ValueError) as e:
+                    logger.warning("Could not map snapshot %s: %s", pointer, e)
+            return self._current
+
+
+_readers: dict[Path, SnapshotReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_reader(data_dir: Optional[Path] = None) -> SnapshotReader:
+    """Shared SnapshotReader for a data dir (one mapping per process)."""
+    key = snapshot_dir(data_dir).resolve()
+    with _readers_lock:
+        if key not in _readers:
+            _readers[key] = SnapshotReader(data_dir)
+        return _readers[key]
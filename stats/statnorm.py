@@ -0,0 +1,198 @@
+"""
+Typed stat records.
+ESPN sends stats as display strings: "45-89" made-attempted pairs, "47.3" or "47.3%"
+percentages, "32:15" times, "W3" streaks, "1,234" counts. normalize_payload() turns
+team statistics and game summaries into records whose values are plain numbers, each
+tagged with its kind and whether higher or lower is better. StatsStorage writes them at harvest time
+to data/{league}/records/{data_type}.json, so comparisons and analytics do arithmetic
+instead of re-parsing strings on every request.
+"""
+
+import re
+from typing import Any, Callable, Optional
+
+NUMBER = "number"
+PERCENT = "percent"
+MADE_ATTEMPTED = "made_attempted"  # value is the percentage made
+DURATION = "duration"  # value is seconds
+STREAK = "streak"  # value is the streak length, negative for losing streaks
+
+HIGHER = "higher"
+LOWER = "lower"
+
+# Stats where a smaller number is the better result. Names containing "against",
+# "loss" or "lost" (goals against, losses, faceoffs lost, ...) are matched by rule.
+LOWER_IS_BETTER = frozenset(
+    s.lower()
+    for s in (
+        "penaltyMinutes", "turnovers", "totalTurnovers", "fouls", "personalFouls", "technicalFouls",
+        "flagrantFouls", "errors", "ERA", "WHIP", "fumblesLost", "penalties", "totalPenaltyYards",
+        "interceptionsThrown", "sacksAllowed", "timesSacked",
+    )
+)
+
+# Stats whose "N-M" display is made-attempted. Other pairs are not: a "10-5" record,
+# totalPenaltiesYards "5-45" (penalties-yards), sacksYardsLost "3-21" (sacks-yards).
+# Names of the form "...Made-...Attempted" and efficiencies ("...Eff") are matched by rule.
+MADE_ATTEMPTED_STATS = frozenset(
+    s.lower()
+    for s in (
+        "fieldGoalsMade-fieldGoalsAttempted", "threePointFieldGoalsMade-threePointFieldGoalsAttempted",
+        "freeThrowsMade-freeThrowsAttempted", "thirdDownEff", "fourthDownEff",
+    )
+)
+_MADE_ATTEMPTED_NAME = re.compile(r"made-\w*attempted$|eff$", re.IGNORECASE)
+
+_PAIR = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s*$")
+_STREAK = re.compile(r"^\s*([WLT])\s*(\d+)\s*$", re.IGNORECASE)
+_DURATION = re.compile(r"^\s*(\d+):(\d{2})(?::(\d{2}))?\s*$")
+_NUMBER = re.compile(r"-?\d[\d,]*(?:\.\d+)?|-?\.\d+")
+_SUFFIX = re.compile(r"_\d+$")
+
+
+def stat_kind(name: str, display: Any) -> str:
+    text = str(display)
+    if name.lower() in MADE_ATTEMPTED_STATS or _MADE_ATTEMPTED_NAME.search(name):
+        return MADE_ATTEMPTED
+    if "streak" in name.lower() and _STREAK.match(text):
+        return STREAK
+    if _DURATION.match(text):
+        return DURATION
+    lower = name.lower()
+    if text.strip().endswith("%") or lower.endswith(("pct", "percentage")):
+        return PERCENT
+    return NUMBER
+
+
+def stat_better(name: str) -> str:
+    lower = name.lower()
+    if lower in LOWER_IS_BETTER or "against" in lower or "loss" in lower or "lost" in lower:
+        return LOWER
+    return HIGHER
+
+
+def parse_value(display: Any, kind: str) -> Optional[float]:
+    """Numeric value of a display string of the given kind; None if it has no number ("--", "")."""
+    text = str(display)
+    if kind == MADE_ATTEMPTED:
+        m = _PAIR.match(text)
+        return int(m.group(1)) / max(1, int(m.group(2))) * 100 if m else None
+    if kind == STREAK:
+        m = _STREAK.match(text)
+        return float(int(m.group(2)) * {"W": 1, "L": -1, "T": 0}[m.group(1).upper()]) if m else None
+    if kind == DURATION:
+        m = _DURATION.match(text)
+        if m:
+            parts = [int(p) for p in m.groups() if p is not None]
+            return float(sum(p * 60 ** i for i, p in enumerate(reversed(parts))))
+    m = _NUMBER.search(text)
+    return float(m.group(0).replace(",", "")) if m else None
+
+
+def stat_record(name: str, display: Any, label: str = "", value: Any = None) -> dict[str, Any]:
+    """
+    One typed stat: name, label, display (as sent), kind, better ("higher"/"lower") and value
+    (a float, or None). Made-attempted stats also carry made and attempted when the display parses. value is the
+    parsed display string; ESPN's raw numeric value is the fallback when it doesn't parse.
+    """
+    display = "" if display is None else str(display)
+    kind = stat_kind(name, display)
+    parsed = parse_value(display, kind)
+    if parsed is None and isinstance(value, (int, float)) and not isinstance(value, bool):
+        parsed = float(value)
+    record = {
+        "name": name,
+        "label": label or name,
+        "display": display,
+        "kind": kind,
+        "better": stat_better(name),
+        "value": parsed,
+    }
+    m = _PAIR.match(display) if kind == MADE_ATTEMPTED else None
+    if m:
+        record["made"], record["attempted"] = int(m.group(1)), int(m.group(2))
+    return record
+
+
+def team_stat_records(stats: Optional[dict]) -> dict[str, dict]:
+    """Stat name -> record for a team statistics response, with ESPN's league rank."""
+    records = {}
+    res = (stats or {}).get("results") or {}
+    for cat in (res.get("stats") or {}).get("categories", []):
+        for s in cat.get("stats", []):
+            if not s.get("name"):
+                continue
+            record = stat_record(
+                s["name"], s.get("displayValue", ""), s.get("shortDisplayName") or s.get("displayName", ""), s.get("value")
+            )
+            record["category"] = cat.get("name", "")
+            record["rank"] = s.get("rank")
+            record["rank_display"] = s.get("rankDisplayValue", "")
+            records[s["name"]] = record
+    return records
+
+
+def competitor_records(competitor: dict) -> dict[str, dict]:
+    """Stat name -> record for one box score team (summary boxscore.teams entry)."""
+    return {
+        s["name"]: stat_record(s["name"], s.get("displayValue", ""), s.get("label", ""))
+        for s in competitor.get("statistics", [])
+        if s.get("name")
+    }
+
+
+def _player_values(keys: list[str], stats: list[Any]) -> dict[str, Optional[float]]:
+    """Key -> number for a box score player line; "made-attempted" keys become two numbers."""
+    values: dict[str, Optional[float]] = {}
+    for key, display in zip(keys, stats):
+        record = stat_record(key, display)
+        if "made" in record and "-" in key:
+            made_key, attempted_key = key.split("-", 1)
+            values[made_key], values[attempted_key] = float(record["made"]), float(record["attempted"])
+        else:
+            values[key] = record["value"]
+    return values
+
+
+def box_score_records(summary: Optional[dict]) -> dict[str, list[dict]]:
+    """
+    Typed box score of a game summary: "teams" (team_id, home_away, stats: name -> record)
+    and "players" (team_id, athlete_id, group, stats: key -> number).
+    """
+    box = (summary or {}).get("boxscore") or {}
+    teams = [
+        {
+            "team_id": str((t.get("team") or {}).get("id", "")),
+            "home_away": t.get("homeAway", ""),
+            "stats": competitor_records(t),
+        }
+        for t in box.get("teams", [])
+    ]
+    players = []
+    for side in box.get("players", []):
+        team_id = str((side.get("team") or {}).get("id", ""))
+        for group in side.get("statistics", []):
+            keys = group.get("keys") or []
+            for a in group.get("athletes", []):
+                if a.get("didNotPlay") or not a.get("stats"):
+                    continue
+                players.append({
+                    "team_id": team_id,
+                    "athlete_id": str((a.get("athlete") or {}).get("id", "")),
+                    "group": group.get("name", ""),
+                    "stats": _player_values(keys, a["stats"]),
+                })
+    return {"teams": teams, "players": players}
+
+
+# Data type (without its _{id} suffix) -> normalizer
+NORMALIZERS: dict[str, Callable[[Any], Any]] = {
+    "team_stats": team_stat_records,
+    "summary": box_score_records,
+}
+
+
+def normalize_payload(data_type: str, data: Any) -> Optional[Any]:
+    """Typed records for a data type's (projected) data, or None if the type has no normalizer."""
+    normalizer = NORMALIZERS.get(data_type) or NORMALIZERS.get(_SUFFIX.sub("", data_type))
+    return normalizer(data) if normalizer is not None else None
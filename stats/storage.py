@@ -3,21 +3,34 @@ Storage layer for harvested sports statistics.
 Saves data as JSON files for easy consumption by websites.
 """
 
-import json
-import sqlite3
+import re
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
-from config import DATA_DIR
+from config import DATA_DIR, KEEP_RAW_PAYLOADS, LEAGUES, WRITE_GZIP
+from archive import ARCHIVED_TYPES, SnapshotArchive, content_hash
+from database import get_database
+from jsonio import dumps, gzip_path, read_json, write_json
+from schema import project_payload, schema_for
+from statnorm import normalize_payload
+
+# Unarchived types saved on every scoreboard tick, usually unchanged: compared with the stored
+# copy so an identical save doesn't rewrite the file (or trigger a snapshot publish)
+UNCHANGED_SKIP = re.compile(r"^(scoreboard_\d{8}|summaries_today)$")
 
 
 class StatsStorage:
     """Stores harvested stats as JSON (website-friendly) and optionally SQLite."""
 
-    def __init__(self, data_dir: Optional[Path] = None):
+    def __init__(self, data_dir: Optional[Path] = None, sqlite: bool = False):
         self.data_dir = Path(data_dir or DATA_DIR)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+        # With sqlite=True, saved payloads are batched and written by flush_sqlite()
+        self.sqlite = sqlite
+        self._sqlite_batch: dict[str, dict[str, Any]] = {}
+        # (league_id, data_type) of every file save_json() actually wrote
+        self.written: set[tuple[str, str]] = set()
 
     def _league_dir(self, league_id: str) -> Path:
         """Get or create league-specific directory."""
@@ -31,43 +44,102 @@ class StatsStorage:
         data_type: str,
         data: Any,
         timestamp: Optional[datetime] = None,
-    ) -> Path:
+    ) -> bool:
         """
-        Save harvested data as JSON file.
-        Structure: data/{league}/{data_type}.json
-        Also saves timestamped copy: data/{league}/{data_type}_{timestamp}.json
+        Save harvested data as compact JSON, written atomically (temp file + os.replace).
+        Returns whether the file was written (False if the data was unchanged).
+        Structure: data/{league}/{data_type}.json (+ .json.gz sibling when WRITE_GZIP)
+        Base types are also archived content-addressed (see archive.py): if the data is
+        identical to the last saved snapshot, neither the current file nor the archive is written.
+        UNCHANGED_SKIP types are likewise left alone when identical to the stored copy.
+        Data is projected through the type's schema (see schema.py) first; with
+        KEEP_RAW_PAYLOADS the unprojected response goes to data/{league}/raw/{data_type}.json.
+        Types with typed stat records (see statnorm.py) also get data/{league}/records/{data_type}.json.
         """
         league_dir = self._league_dir(league_id)
         timestamp = timestamp or datetime.now()
-        ts_str = timestamp.strftime("%Y%m%d_%H%M%S")
 
-        # Always write the "current" file (latest harvest)
+        if KEEP_RAW_PAYLOADS and schema_for(data_type) is not None:
+            raw_dir = league_dir / "raw"
+            raw_dir.mkdir(exist_ok=True)
+            write_json(raw_dir / f"{data_type}.json", data)
+        data = project_payload(data_type, data)
+        if self.sqlite:
+            self._sqlite_batch.setdefault(league_id, {})[data_type] = data
+
         current_path = league_dir / f"{data_type}.json"
+        archive = None
+        if data_type in ARCHIVED_TYPES:
+            archive = SnapshotArchive(league_dir)
+            encoded = dumps(data)
+            digest = content_hash(encoded)
+            if current_path.exists() and archive.current_hash(data_type) == digest:
+                return False
+        elif UNCHANGED_SKIP.match(data_type) and current_path.exists():
+            stored = read_json(current_path)
+            if stored and dumps(stored.get("data")) == dumps(data):
+                return False
+
         payload = {
             "league": league_id,
             "data_type": data_type,
             "harvested_at": timestamp.isoformat(),
             "data": data,
         }
-        with open(current_path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2, ensure_ascii=False)
+        write_json(current_path, payload, precompress=WRITE_GZIP)
+        if not WRITE_GZIP:
+            # A sibling left by an earlier run with STATS_WRITE_GZIP=1 would now be stale
+            gzip_path(current_path).unlink(missing_ok=True)
+        if archive is not None:
+            archive.record(data_type, digest, encoded, timestamp)
+        records = normalize_payload(data_type, data)
+        if records is not None:
+            records_dir = league_dir / "records"
+            records_dir.mkdir(exist_ok=True)
+            write_json(records_dir / f"{data_type}.json", {**payload, "data": records})
+
+        self.written.add((league_id, data_type))
+        return True
+
+    def compact(self, retention_days: Optional[int] = None) -> int:
+        """Roll archived history older than today into daily packs for every league."""
+        total = 0
+        for league_id in LEAGUES:
+            league_dir = self.data_dir / league_id
+            if not league_dir.is_dir():
+                continue
+            archive = SnapshotArchive(league_dir)
+            if retention_days is None:
+                total += archive.compact()
+            else:
+                total += archive.compact(retention_days=retention_days)
+        return total
 
-        # Archive copy for base types only (skip dated/summary types)
-        base_types = ("teams", "standings", "scoreboard", "schedule")
-        if data_type in base_types and not data_type.startswith("summary_"):
-            archive_path = league_dir / f"{data_type}_{ts_str}.json"
-            with open(archive_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, indent=2, ensure_ascii=False)
+    def load_snapshot(self, league_id: str, data_type: str, when: datetime) -> Optional[Any]:
+        """Archived data for a league and type as it was at a point in time."""
+        return SnapshotArchive(self.data_dir / league_id).read_snapshot(data_type, when)
 
-        return current_path
+    def exists(self, league_id: str, data_type: str) -> bool:
+        """Whether a current file has been saved for this league and data type."""
+        return (self.data_dir / league_id / f"{data_type}.json").exists()
 
     def load_json(self, league_id: str, data_type: str) -> Optional[dict]:
         """Load most recent harvested data for a league."""
         path = self.data_dir / league_id / f"{data_type}.json"
         if not path.exists():
             return None
-        with open(path, encoding="utf-8") as f:
-            return json.load(f)
+        return read_json(path)
+
+    def load_fresh(self, league_id: str, data_type: str, max_age: float) -> Optional[dict]:
+        """load_json(), or None if nothing is stored or it was harvested more than max_age seconds ago."""
+        payload = self.load_json(league_id, data_type)
+        if not payload:
+            return None
+        try:
+            age = datetime.now() - datetime.fromisoformat(payload["harvested_at"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return payload if age.total_seconds() < max_age else None
 
     def save_to_sqlite(
         self,
@@ -77,37 +149,19 @@ class StatsStorage:
         timestamp: Optional[datetime] = None,
     ) -> Path:
         """
-        Save to SQLite for structured querying.
+        Save to the normalized SQLite store (see database.py) for structured querying.
         Useful for website backends that need SQL access.
         """
-        db_path = self.data_dir / "stats.db"
-        timestamp = timestamp or datetime.now()
+        db = get_database(self.data_dir)
+        db.write_run({league_id: {data_type: data}}, timestamp)
+        return db.db_path
 
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        try:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS harvests (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    league TEXT NOT NULL,
-                    data_type TEXT NOT NULL,
-                    harvested_at TEXT NOT NULL,
-                    data_json TEXT NOT NULL,
-                    UNIQUE(league, data_type)
-                )
-            """)
-            conn.execute(
-                """
-                INSERT OR REPLACE INTO harvests (league, data_type, harvested_at, data_json)
-                VALUES (?, ?, ?, ?)
-                """,
-                (league_id, data_type, timestamp.isoformat(), json.dumps(data)),
-            )
-            conn.commit()
-        finally:
-            conn.close()
-
-        return db_path
+    def flush_sqlite(self, timestamp: Optional[datetime] = None) -> int:
+        """Write everything saved since the last flush to SQLite as one transaction."""
+        if not self._sqlite_batch:
+            return 0
+        batch, self._sqlite_batch = self._sqlite_batch, {}
+        return get_database(self.data_dir).write_run(batch, timestamp)
 
     def get_website_data_path(self) -> Path:
         """Return the data directory path for website consumption."""